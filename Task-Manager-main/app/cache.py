@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from dotenv import load_dotenv
+import os
+import threading
+import time
+
+load_dotenv()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed time-to-live.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop a single entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop every entry whose value matches ``predicate``"""
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Authenticated users keyed by the JWT subject (email)
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def invalidate_user(user: Any) -> None:
+    """Forget every cached entry for ``user`` (matched by id, not email)"""
+    user_cache.pop_where(lambda cached: cached.id == user.id)
+
+
+# Aggregated task statistics keyed by (owner id, task version)
+task_stats_cache = TTLCache(
+    maxsize=int(os.getenv("TASK_STATS_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("TASK_STATS_CACHE_TTL_SECONDS", "30")),
+)
+
+# Task counts served as X-Total-Count, keyed by (owner id, task version, filter)
+task_count_cache = TTLCache(
+    maxsize=int(os.getenv("TASK_COUNT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("TASK_COUNT_CACHE_TTL_SECONDS", "60")),
+)
@@ -0,0 +1,96 @@
+"""
+Pick password hash parameters for a target verify latency on this machine.
+
+Run on the deployment hardware (ideally while it is otherwise idle), from
+the project root:
+
+    python -m app.calibrate_hashing --scheme bcrypt --target-ms 250
+    python -m app.calibrate_hashing --scheme argon2 --target-ms 100 --memory-kib 65536
+
+It measures a verify at increasing cost and suggests the most expensive
+setting that stays within the target. Existing hashes move to the new
+parameters as users log in.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from app.hashing import build_context, hashing_pool
+
+PASSWORD = "calibration-password"
+
+# Below these the hashes are too cheap to be worth suggesting
+MIN_BCRYPT_ROUNDS = 10
+MIN_ARGON2_TIME_COST = 1
+
+
+def verify_ms(context, samples: int) -> float:
+    hashed = context.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def candidates(args):
+    """(cost, context, env settings) for increasing cost"""
+    if args.scheme == "bcrypt":
+        for rounds in range(MIN_BCRYPT_ROUNDS, 21):
+            yield rounds, build_context(["bcrypt"], bcrypt_rounds=rounds), {
+                "PASSWORD_HASH_BCRYPT_ROUNDS": rounds
+            }
+    else:
+        for time_cost in range(MIN_ARGON2_TIME_COST, 21):
+            context = build_context(
+                ["argon2"], argon2_time_cost=time_cost,
+                argon2_memory_kib=args.memory_kib, argon2_parallelism=args.parallelism
+            )
+            yield time_cost, context, {
+                "PASSWORD_HASH_ARGON2_TIME_COST": time_cost,
+                "PASSWORD_HASH_ARGON2_MEMORY_KIB": args.memory_kib,
+                "PASSWORD_HASH_ARGON2_PARALLELISM": args.parallelism,
+            }
+
+
+def main(args) -> int:
+    cost_name = "rounds" if args.scheme == "bcrypt" else "time cost"
+    print(f"{args.scheme}: target {args.target_ms:.0f} ms per verify, "
+          f"{hashing_pool.workers} hashing workers\n")
+    print(f"{cost_name:<12}{'verify ms':>12}{'logins/s':>12}")
+
+    chosen = None
+    for cost, context, settings in candidates(args):
+        ms = verify_ms(context, args.samples)
+        print(f"{cost:<12}{ms:>12.1f}{hashing_pool.workers * 1000 / ms:>12.1f}")
+        if ms > args.target_ms:
+            break
+        chosen = settings
+
+    if chosen is None:
+        print(f"\nEven the cheapest setting is slower than {args.target_ms:.0f} ms; "
+              f"raise the target or use faster hardware.")
+        return 1
+    # Keep bcrypt listed after argon2 so existing hashes still verify
+    schemes = "argon2,bcrypt" if args.scheme == "argon2" else "bcrypt"
+    print("\nSuggested settings:\n")
+    print(f"PASSWORD_HASH_SCHEMES={schemes}")
+    for name, value in chosen.items():
+        print(f"{name}={value}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate password hash cost")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250, help="Target verify latency")
+    parser.add_argument("--samples", type=int, default=5, help="Verifies timed per setting")
+    parser.add_argument("--memory-kib", type=int, default=19456, help="argon2 memory cost")
+    parser.add_argument("--parallelism", type=int, default=1, help="argon2 lanes")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -1,67 +1,138 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+from beanie.odm.utils.init import Initializer
 from dotenv import load_dotenv
 import os
 from typing import Optional
-from .models import User, Task
+from .models import User, Task, TaskVersion, RefreshSession
+from .monitoring import pool_stats, command_timings
+from .indexes import ensure_indexes, cancel_background_build
+from .log import timed
 import asyncio
+import logging
+import random
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017/taskmaster")
 DB_NAME = os.getenv("DB_NAME", "taskmaster")
 
-# MongoDB Client
+# Connection pool / driver tuning (unset values keep the driver defaults)
+MONGODB_MIN_POOL_SIZE = os.getenv("MONGODB_MIN_POOL_SIZE")
+MONGODB_MAX_POOL_SIZE = os.getenv("MONGODB_MAX_POOL_SIZE")
+MONGODB_MAX_IDLE_TIME_MS = os.getenv("MONGODB_MAX_IDLE_TIME_MS")
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS")
+MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS")  # e.g. "zstd,snappy,zlib"
+MONGODB_ZLIB_COMPRESSION_LEVEL = os.getenv("MONGODB_ZLIB_COMPRESSION_LEVEL")
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE")  # e.g. "secondaryPreferred"
+MONGODB_WRITE_CONCERN = os.getenv("MONGODB_WRITE_CONCERN")  # e.g. "majority" or "1"
+
+# Startup
+MONGODB_CONNECT_RETRIES = int(os.getenv("MONGODB_CONNECT_RETRIES", "5"))
+MONGODB_RETRY_BASE_DELAY = float(os.getenv("MONGODB_RETRY_BASE_DELAY_SECONDS", "0.25"))
+MONGODB_RETRY_MAX_DELAY = float(os.getenv("MONGODB_RETRY_MAX_DELAY_SECONDS", "5"))
+INDEX_BUILD_MODE = os.getenv("INDEX_BUILD_MODE", "foreground")  # foreground | background | off
+
+DOCUMENT_MODELS = [User, Task, TaskVersion, RefreshSession]
+
+# MongoDB Client (one per process, created by init_db in the lifespan)
 client: Optional[AsyncIOMotorClient] = None
 
 
-async def init_db(retries: int = 3, delay: int = 5):
+def client_options() -> dict:
+    """
+    Keyword arguments for AsyncIOMotorClient built from the environment.
+    """
+    options = {
+        "serverSelectionTimeoutMS": 5000,
+        "connectTimeoutMS": 5000,
+    }
+    if MONGODB_MIN_POOL_SIZE:
+        options["minPoolSize"] = int(MONGODB_MIN_POOL_SIZE)
+    if MONGODB_MAX_POOL_SIZE:
+        options["maxPoolSize"] = int(MONGODB_MAX_POOL_SIZE)
+    if MONGODB_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = int(MONGODB_MAX_IDLE_TIME_MS)
+    if MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGODB_WAIT_QUEUE_TIMEOUT_MS)
+    if MONGODB_COMPRESSORS:
+        options["compressors"] = MONGODB_COMPRESSORS
+    if MONGODB_ZLIB_COMPRESSION_LEVEL:
+        options["zlibCompressionLevel"] = int(MONGODB_ZLIB_COMPRESSION_LEVEL)
+    if MONGODB_READ_PREFERENCE:
+        options["readPreference"] = MONGODB_READ_PREFERENCE
+    if MONGODB_WRITE_CONCERN:
+        w = MONGODB_WRITE_CONCERN
+        options["w"] = int(w) if w.isdigit() else w
+    return options
+
+
+class _Initializer(Initializer):
+    """
+    Beanie initialisation without its unconditional index sync (see app.indexes).
+
+    Initializer and its init_indexes hook are Beanie internals, not public API,
+    which is why requirements.txt pins beanie to exactly 1.23.6. Check this
+    override still matches before bumping it.
+    """
+
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        pass
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (1-based) attempt"""
+    cap = min(MONGODB_RETRY_MAX_DELAY, MONGODB_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+async def init_db(retries: int = MONGODB_CONNECT_RETRIES, index_mode: str = INDEX_BUILD_MODE):
     """
-    Initialize MongoDB client and Beanie ODM with retry logic.
+    Initialize MongoDB client and Beanie ODM, retrying the connection with
+    exponential backoff. Each phase is recorded with ``timed`` so startup can
+    report where its time went.
     """
     global client
+    if retries < 1:
+        raise ValueError(f"MONGODB_CONNECT_RETRIES must be at least 1, got {retries}")
     for attempt in range(1, retries + 1):
+        client = AsyncIOMotorClient(
+            MONGODB_URL,
+            event_listeners=[pool_stats, command_timings],
+            **client_options()
+        )
         try:
-            client = AsyncIOMotorClient(
-                MONGODB_URL,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000
-            )
-
             # Test MongoDB connection
-            await client.server_info()
-
-            # Initialize Beanie with the database and document models
-            await init_beanie(
-                database=client[DB_NAME],
-                document_models=[User, Task]
-            )
-            print(f"✅ Successfully connected to MongoDB on attempt {attempt}")
-            return
-
+            with timed("db_connect"):
+                await client.admin.command("ping")
+            break
         except Exception as e:
-            print(f"❌ Attempt {attempt} to connect to MongoDB failed: {e}")
+            client.close()
             if attempt < retries:
-                print(f"⏳ Retrying in {delay} seconds...")
+                delay = retry_delay(attempt)
+                logger.warning(
+                    "MongoDB connection attempt failed, retrying",
+                    extra={"attempt": attempt, "error": str(e), "retry_in_s": round(delay, 3)}
+                )
                 await asyncio.sleep(delay)
             else:
-                print("💥 Failed to connect to MongoDB after all attempts")
+                logger.error("Failed to connect to MongoDB after all attempts", extra={"attempts": retries})
                 raise
 
-
-async def get_database():
-    """
-    Return the database instance. Ensures DB is initialized.
-    """
-    if not client:
-        await init_db()
-    return client[DB_NAME]
+    # Initialize Beanie with the database and document models
+    with timed("beanie_init"):
+        await _Initializer(database=client[DB_NAME], document_models=DOCUMENT_MODELS)
+    with timed("index_check"):
+        await ensure_indexes(DOCUMENT_MODELS, index_mode)
+    logger.info("Connected to MongoDB", extra={"attempt": attempt})
 
 
 async def close_db():
     """
     Close the MongoDB connection (if needed, typically on shutdown).
     """
+    await cancel_background_build()
     if client:
         client.close()
-        print("🔌 MongoDB connection closed")
+        logger.info("MongoDB connection closed")
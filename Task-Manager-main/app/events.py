@@ -0,0 +1,224 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Set
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+from .metrics import registry, CallbackGauge
+from .models import Task
+from . import database
+import asyncio
+import json
+import logging
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_SOURCE = os.getenv("TASK_EVENTS_SOURCE", "auto")  # auto | change_stream | memory
+TASK_EVENTS_QUEUE_SIZE = int(os.getenv("TASK_EVENTS_QUEUE_SIZE", "256"))
+
+TASK_FIELDS = [
+    "id", "title", "description", "priority", "due_date",
+    "completed", "created_at", "updated_at", "owner_id"
+]
+
+# Pre-images (fullDocumentBeforeChange) need MongoDB 6.0, wire version 17
+_PRE_IMAGE_WIRE_VERSION = 17
+
+
+def serialize_task(document: dict) -> dict:
+    """Flatten a raw task document into JSON friendly values"""
+    row = {"id": str(document["_id"])}
+    for field in TASK_FIELDS[1:]:
+        value = document.get(field)
+        row[field] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+class TaskEventBroker:
+    """
+    Fans task change events out to the streams of the owning user.
+
+    With a replica set, one change stream per process is the only source of
+    events, so changes made by other workers or services are seen too.
+    Against a standalone mongod the routers' own ``publish`` calls are
+    delivered directly instead (and only reach this process's clients).
+
+    Each subscriber has a bounded queue; a client that falls behind has its
+    backlog replaced by a single ``resync`` event.
+    """
+
+    def __init__(self, queue_size: int = TASK_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.mode = "memory"
+        # Whether change stream delete events carry the deleted task's owner
+        self.pre_images = False
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    # --- Subscribers ---
+
+    def subscribe(self, owner_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[owner_id].add(queue)
+        return queue
+
+    def unsubscribe(self, owner_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(owner_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[owner_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def _deliver(self, queues, event: dict) -> None:
+        for queue in list(queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    def _deliver_to_owner(self, owner_id: str, event: dict) -> None:
+        queues = self._subscribers.get(owner_id)
+        if queues:
+            self._deliver(queues, event)
+
+    def publish(self, owner_id: str, event_type: str, **data) -> None:
+        """
+        Report a change made by this process. With a change stream as the
+        source only what the stream cannot deliver is passed on: ``resync``
+        (bulk writes and imports) and, without pre-images, deletes.
+        """
+        if (self.mode == "memory" or event_type == "resync"
+                or (event_type == "deleted" and not self.pre_images)):
+            self._deliver_to_owner(owner_id, {"type": event_type, **data})
+
+    # --- Change stream ---
+
+    async def _supports_change_streams(self) -> bool:
+        hello = await database.client.admin.command("hello")
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    async def start(self) -> None:
+        """Pick the event source and start the change stream watcher if used"""
+        if TASK_EVENTS_SOURCE == "memory":
+            use_change_stream = False
+        elif TASK_EVENTS_SOURCE == "change_stream":
+            use_change_stream = True
+        else:
+            try:
+                use_change_stream = await self._supports_change_streams()
+            except Exception as e:
+                logger.warning("Could not detect change stream support", extra={"error": str(e)})
+                use_change_stream = False
+
+        self.mode = "change_stream" if use_change_stream else "memory"
+        logger.info("Task events source selected", extra={"source": self.mode})
+        if use_change_stream and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _enable_pre_images(self) -> bool:
+        """Turn on pre-images for ``tasks`` so delete events name the owner"""
+        hello = await database.client.admin.command("hello")
+        if hello.get("maxWireVersion", 0) < _PRE_IMAGE_WIRE_VERSION:
+            return False
+        collection = Task.get_motor_collection()
+        try:
+            await collection.database.command(
+                "collMod", collection.name, changeStreamPreAndPostImages={"enabled": True}
+            )
+        except OperationFailure as e:
+            logger.warning(
+                "Could not enable change stream pre-images on tasks",
+                extra={"error": str(e)}
+            )
+            return False
+        return True
+
+    async def _watch(self) -> None:
+        options = {"full_document": "updateLookup"}
+        self.pre_images = await self._enable_pre_images()
+        if self.pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+
+        resume_token = None
+        delay = 0.5
+        while True:
+            try:
+                async with Task.get_motor_collection().watch(
+                    pipeline, resume_after=resume_token, **options
+                ) as stream:
+                    delay = 0.5
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._handle_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # e.g. the resume point fell off the oplog: start afresh and
+                # tell every client it may have missed changes
+                logger.warning("Task change stream could not resume", extra={"error": str(e)})
+                resume_token = None
+                for queues in list(self._subscribers.values()):
+                    self._deliver(queues, {"type": "resync"})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            except Exception as e:
+                logger.warning(
+                    "Task change stream failed, reopening",
+                    extra={"error": str(e), "retry_in_s": delay}
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _handle_change(self, change: dict) -> None:
+        operation = change["operationType"]
+        if operation == "delete":
+            task_id = str(change["documentKey"]["_id"])
+            before = change.get("fullDocumentBeforeChange")
+            if before is None:
+                # Without a pre-image the owner is unknown, so the event is
+                # dropped rather than sent to other users; deletes made by
+                # this process still reach the owner through publish()
+                logger.debug("Delete event without pre-image skipped", extra={"task_id": task_id})
+                return
+            owner_id = before["owner_id"]
+            event = {"type": "deleted", "id": task_id}
+        else:
+            document = change.get("fullDocument")
+            if document is None:  # deleted before the update could be looked up
+                return
+            owner_id = document["owner_id"]
+            event_type = "created" if operation == "insert" else "updated"
+            event = {"type": event_type, "task": serialize_task(document)}
+
+        self._deliver_to_owner(owner_id, event)
+
+
+task_events = TaskEventBroker()
+
+registry.register(CallbackGauge(
+    "task_event_subscribers", "Open task event streams in this process",
+    lambda: task_events.subscriber_count
+))
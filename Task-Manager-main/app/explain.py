@@ -0,0 +1,153 @@
+"""
+Query plan audit: runs ``explain`` on the query shapes issued by the routers
+and reports any that fall back to a collection scan, plus indexes on the
+collections that no model declares.
+
+Usage (from the project root, with MONGODB_URL/DB_NAME pointing at a server):
+
+    python -m app.explain
+"""
+from itertools import product
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+import asyncio
+import sys
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from .database import init_db, close_db, DOCUMENT_MODELS
+from .indexes import existing_indexes, undeclared_indexes
+from .models import Task, TaskVersion, User, RefreshSession, Priority, TaskSort, CASE_INSENSITIVE
+from .pagination import sort_spec, keyset_filter
+from .routers.auth import _login_filter
+from .routers.tasks import _task_query, _task_filter, _parse_sort, _stats_pipeline
+
+Shape = Tuple[str, Callable[[], Awaitable[dict]]]
+
+SAMPLE_OWNER_ID = "507f1f77bcf86cd799439011"
+
+
+def plan_stages(plan: dict) -> Iterator[str]:
+    """Yield every stage name in an explain plan tree"""
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def winning_plan(explain: dict) -> dict:
+    """Winning plan of a find explain, or of the first stage of an aggregate one"""
+    if "queryPlanner" not in explain:
+        explain = explain["stages"][0]["$cursor"]
+    return explain["queryPlanner"]["winningPlan"]
+
+
+def uses_index(explain: dict) -> bool:
+    stages = list(plan_stages(winning_plan(explain)))
+    return "COLLSCAN" not in stages and any(s in ("IXSCAN", "EXPRESS_IXSCAN", "IDHACK") for s in stages)
+
+
+def find_shape(name: str, model, query: dict, sort: Optional[list] = None,
+               limit: int = 0, collation=None) -> Shape:
+    async def explain() -> dict:
+        cursor = model.get_motor_collection().find(query, collation=collation)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.limit(limit).explain()
+    return name, explain
+
+
+def aggregate_shape(name: str, model, pipeline: list) -> Shape:
+    async def explain() -> dict:
+        collection = model.get_motor_collection()
+        return await collection.database.command(
+            "aggregate", collection.name, pipeline=pipeline, explain=True
+        )
+    return name, explain
+
+
+def task_list_shapes() -> List[Shape]:
+    """Every filter/sort combination accepted by GET /api/tasks/"""
+    now = datetime.utcnow()
+    shapes = []
+    for completed, priority, due, sort in product(
+        (None, False),
+        (None, Priority.HIGH),
+        ((None, None), (now, None), (None, now - timedelta(days=7)), (now, now - timedelta(days=7))),
+        list(TaskSort),
+    ):
+        query = _task_query(SAMPLE_OWNER_ID, completed, priority, *due)
+        field, direction = _parse_sort(sort)
+        name = (
+            f"tasks completed={completed} priority={priority and priority.value} "
+            f"due_before={due[0] is not None} due_after={due[1] is not None} sort={sort.value}"
+        )
+        shapes.append(find_shape(name, Task, query, sort_spec(field, direction), 101))
+    return shapes
+
+
+def task_cursor_shapes() -> List[Shape]:
+    """Follow-up pages of GET /api/tasks/: the keyset ($or on sort field and _id) ANDed with the filters"""
+    now = datetime.utcnow()
+    shapes = []
+    for completed, sort in product((None, False), list(TaskSort)):
+        field, direction = _parse_sort(sort)
+        # A null cursor value only occurs for tasks without a due date
+        for value in ((now, None) if field == "due_date" else (now,)):
+            query = {"$and": [
+                _task_query(SAMPLE_OWNER_ID, completed, None, None, None),
+                keyset_filter(field, direction, value, ObjectId()),
+            ]}
+            name = f"tasks cursor completed={completed} sort={sort.value} after_null={value is None}"
+            shapes.append(find_shape(name, Task, query, sort_spec(field, direction), 101))
+    return shapes
+
+
+def point_lookup_shapes() -> List[Shape]:
+    """Auth, user, single-task, version and session lookups"""
+    task_id = str(ObjectId())
+    return [
+        find_shape("users login by email", User, _login_filter("someone@example.com"),
+                   limit=1, collation=CASE_INSENSITIVE),
+        find_shape("users login by username", User, _login_filter("someone"),
+                   limit=1, collation=CASE_INSENSITIVE),
+        find_shape("users by id", User, {"_id": ObjectId(SAMPLE_OWNER_ID)}, limit=1),
+        find_shape("users list page", User,
+                   keyset_filter("created_at", ASCENDING, datetime.utcnow(), ObjectId()),
+                   sort_spec("created_at", ASCENDING), 101),
+        find_shape("tasks read/update/delete by id", Task, _task_filter(task_id, SAMPLE_OWNER_ID), limit=1),
+        find_shape("tasks bulk existence check", Task,
+                   {"_id": {"$in": [ObjectId(), ObjectId()]}, "owner_id": SAMPLE_OWNER_ID}),
+        find_shape("tasks export", Task, {"owner_id": SAMPLE_OWNER_ID}, sort_spec("created_at", ASCENDING)),
+        aggregate_shape("tasks stats", Task, _stats_pipeline(SAMPLE_OWNER_ID, datetime.utcnow())),
+        find_shape("task_versions by owner", TaskVersion, {"_id": SAMPLE_OWNER_ID}, limit=1),
+        find_shape("sessions refresh", RefreshSession,
+                   {"_id": "0" * 64, "expires_at": {"$gt": datetime.utcnow()}}, limit=1),
+        find_shape("sessions by user", RefreshSession, {"user_id": SAMPLE_OWNER_ID}),
+    ]
+
+
+async def audit() -> int:
+    await init_db()
+    failures = 0
+    try:
+        for name, explain in point_lookup_shapes() + task_list_shapes() + task_cursor_shapes():
+            plan = await explain()
+            ok = uses_index(plan)
+            failures += not ok
+            stages = " > ".join(plan_stages(winning_plan(plan)))
+            print(f"{'ok  ' if ok else 'SCAN'} {name}: {stages}")
+        for model in DOCUMENT_MODELS:
+            for index in undeclared_indexes(model, await existing_indexes(model)):
+                print(f"undeclared index {model.get_collection_name()}.{index}: drop it if nothing relies on it")
+    finally:
+        await close_db()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(audit()) else 0)
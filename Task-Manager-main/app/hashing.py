@@ -0,0 +1,189 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from passlib.context import CryptContext
+from passlib.exc import MissingBackendError
+from .metrics import registry, CallbackCounter, CallbackGauge
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+import asyncio
+import os
+import time
+
+load_dotenv()
+
+# --- Hash scheme ---
+#
+# New hashes use the first scheme of PASSWORD_HASH_SCHEMES with the
+# parameters below. Hashes made with another listed scheme, or with other
+# parameters, still verify and are replaced on the user's next successful
+# login (see ``verify_and_update``). argon2 needs the argon2-cffi package.
+# ``python -m app.calibrate_hashing`` suggests parameters for this hardware.
+
+PASSWORD_HASH_SCHEMES = [
+    scheme.strip() for scheme in os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt").split(",") if scheme.strip()
+]
+PASSWORD_HASH_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_HASH_BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_ARGON2_TIME_COST = int(os.getenv("PASSWORD_HASH_ARGON2_TIME_COST", "2"))
+PASSWORD_HASH_ARGON2_MEMORY_KIB = int(os.getenv("PASSWORD_HASH_ARGON2_MEMORY_KIB", "19456"))
+PASSWORD_HASH_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_HASH_ARGON2_PARALLELISM", "1"))
+
+
+def build_context(schemes: List[str] = PASSWORD_HASH_SCHEMES,
+                  bcrypt_rounds: int = PASSWORD_HASH_BCRYPT_ROUNDS,
+                  argon2_time_cost: int = PASSWORD_HASH_ARGON2_TIME_COST,
+                  argon2_memory_kib: int = PASSWORD_HASH_ARGON2_MEMORY_KIB,
+                  argon2_parallelism: int = PASSWORD_HASH_ARGON2_PARALLELISM) -> CryptContext:
+    settings = {}
+    if "bcrypt" in schemes:
+        settings["bcrypt__rounds"] = bcrypt_rounds
+    if "argon2" in schemes:
+        settings.update(
+            argon2__rounds=argon2_time_cost,
+            argon2__memory_cost=argon2_memory_kib,
+            argon2__parallelism=argon2_parallelism,
+        )
+    context = CryptContext(schemes=schemes, deprecated="auto", **settings)
+    try:
+        context.handler().get_backend()
+    except MissingBackendError as e:
+        raise RuntimeError(f"Password hash scheme {schemes[0]!r} is not available: {e}")
+    return context
+
+
+pwd_context = build_context()
+
+# --- Worker functions (module level so they can be pickled for process pools) ---
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class HashingPool:
+    """
+    Runs password hashing off the event loop on a thread or process pool.
+
+    At most ``max_concurrency`` hashes are handed to the executor at once;
+    further callers wait on a semaphore so the backlog stays visible in
+    ``stats()`` instead of piling up inside the executor queue. Once
+    ``max_waiting`` callers are queued the pool reports itself ``saturated``
+    so routes can turn new work away.
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, max_waiting: Optional[int] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor: {kind}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self.max_waiting = max_waiting
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.wait_seconds += started_at - queued_at
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+        self.completed += 1
+        return result
+
+    @property
+    def saturated(self) -> bool:
+        return self.max_waiting is not None and self.waiting >= self.max_waiting
+
+    async def hash(self, password: str) -> str:
+        """Generate a hashed version of the password"""
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; if it matches a hash made with an outdated scheme or
+        parameters, also return a replacement hash (else None)
+        """
+        return await self._submit(_verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "scheme": pwd_context.default_scheme(),
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_waiting": self.max_waiting,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_seconds / finished * 1000, 3) if finished else 0.0,
+            "avg_run_ms": round(self.run_seconds / finished * 1000, 3) if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+hashing_pool = HashingPool(
+    kind=os.getenv("PASSWORD_HASH_EXECUTOR", "thread"),
+    workers=_optional_int("PASSWORD_HASH_WORKERS"),
+    max_concurrency=_optional_int("PASSWORD_HASH_MAX_CONCURRENCY"),
+    max_waiting=_optional_int("PASSWORD_HASH_MAX_WAITING"),
+)
+
+for _field, _help in (
+    ("waiting", "Password hashes queued for a worker"),
+    ("running", "Password hashes in progress"),
+):
+    registry.register(CallbackGauge(
+        f"password_hash_{_field}", _help, lambda field=_field: getattr(hashing_pool, field)
+    ))
+
+for _field, _help in (
+    ("completed", "Password hashes completed"),
+    ("failed", "Password hashes that raised"),
+):
+    registry.register(CallbackCounter(
+        f"password_hash_{_field}_total", _help, lambda field=_field: getattr(hashing_pool, field)
+    ))
@@ -0,0 +1,155 @@
+from typing import Optional
+from dotenv import load_dotenv
+from .monitoring import pool_stats
+from .metrics import registry, CallbackGauge
+from . import database
+import asyncio
+import logging
+import os
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "5"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+# A heartbeat older than this is treated as a failed check
+HEALTH_MAX_STALENESS_SECONDS = float(
+    os.getenv("HEALTH_MAX_STALENESS_SECONDS", str(HEALTH_CHECK_INTERVAL_SECONDS * 3))
+)
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "500"))
+HEALTH_MAX_POOL_SATURATION = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "1.0"))
+
+# pymongo's default when MONGODB_MAX_POOL_SIZE is unset
+DEFAULT_MAX_POOL_SIZE = 100
+
+
+class Heartbeat:
+    """
+    Pings MongoDB from a background task and caches the outcome, so health
+    probes are answered from memory instead of issuing a command per hit.
+
+    The same loop measures event-loop lag: how much later than scheduled the
+    task wakes up from its sleep.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+                 timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS):
+        self.interval = interval
+        self.timeout = timeout
+        self.db_ok = False
+        self.db_latency_ms: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.loop_lag_ms = 0.0
+        self._checked_monotonic: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> None:
+        """Ping the database once and record the result"""
+        start = time.perf_counter()
+        try:
+            if database.client is None:
+                raise RuntimeError("MongoDB client not initialised")
+            db = database.client[database.DB_NAME]
+            await asyncio.wait_for(db.command("ping"), timeout=self.timeout)
+        except Exception as e:
+            if self.db_ok:
+                logger.warning("Database heartbeat failed", extra={"error": str(e)})
+            self.db_ok = False
+            self.db_error = str(e) or type(e).__name__
+        else:
+            if not self.db_ok and self.checked_at is not None:
+                logger.info("Database heartbeat recovered")
+            self.db_ok = True
+            self.db_error = None
+        self.db_latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.checked_at = time.time()
+        self._checked_monotonic = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.loop_lag_ms = round(max(time.monotonic() - scheduled, 0.0) * 1000, 3)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        if self._checked_monotonic is None:
+            return None
+        return round(time.monotonic() - self._checked_monotonic, 3)
+
+    @property
+    def db_healthy(self) -> bool:
+        age = self.age_seconds
+        return self.db_ok and age is not None and age <= HEALTH_MAX_STALENESS_SECONDS
+
+    def database_status(self) -> dict:
+        return {
+            "status": "connected" if self.db_healthy else "unavailable",
+            "latency_ms": self.db_latency_ms,
+            "checked_at": self.checked_at,
+            "age_seconds": self.age_seconds,
+            "error": self.db_error,
+        }
+
+
+def pool_saturation() -> dict:
+    """Share of the connection pool checked out, plus operations queued for one"""
+    stats = pool_stats.snapshot()
+    max_size = database.client_options().get("maxPoolSize", DEFAULT_MAX_POOL_SIZE)
+    capacity = max_size * max(stats["pools"], 1) if max_size else 0
+    return {
+        "in_use": stats["in_use"],
+        "waiting": stats["waiting"],
+        "max_pool_size": max_size,
+        "saturation": round(stats["in_use"] / capacity, 3) if capacity else 0.0,
+    }
+
+
+def readiness() -> dict:
+    """Readiness report; ``ready`` is False if any check is failing"""
+    pool = pool_saturation()
+    checks = {
+        "database": heartbeat.db_healthy,
+        "event_loop": heartbeat.loop_lag_ms <= HEALTH_MAX_LOOP_LAG_MS,
+        "connection_pool": pool["saturation"] < HEALTH_MAX_POOL_SATURATION or pool["waiting"] == 0,
+    }
+    return {
+        "ready": all(checks.values()),
+        "checks": checks,
+        "database": heartbeat.database_status(),
+        "event_loop": {"lag_ms": heartbeat.loop_lag_ms, "max_lag_ms": HEALTH_MAX_LOOP_LAG_MS},
+        "connection_pool": pool,
+    }
+
+
+heartbeat = Heartbeat()
+
+registry.register(CallbackGauge(
+    "mongodb_heartbeat_up", "1 if the last MongoDB heartbeat succeeded",
+    lambda: 1 if heartbeat.db_healthy else 0
+))
+registry.register(CallbackGauge(
+    "mongodb_heartbeat_latency_seconds", "Latency of the last MongoDB heartbeat ping",
+    lambda: (heartbeat.db_latency_ms or 0.0) / 1000
+))
+registry.register(CallbackGauge(
+    "event_loop_lag_seconds", "Event loop scheduling lag measured by the heartbeat",
+    lambda: heartbeat.loop_lag_ms / 1000
+))
@@ -0,0 +1,149 @@
+from beanie import Document
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, List, Optional, Sequence, Type
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Indexes are declared once, in each model's ``Settings.indexes``. Instead of
+# letting Beanie re-issue createIndexes for all of them on every boot, startup
+# reads the existing indexes and only builds the ones that are missing.
+
+INDEX_BUILD_MODES = ("foreground", "background", "off")
+
+_background_task: Optional[asyncio.Task] = None
+
+
+def declared_indexes(model: Type[Document]) -> List[IndexModel]:
+    """``Settings.indexes`` of an initialised model as IndexModel instances"""
+    # Beanie has already parsed strings and tuples into IndexModelField
+    return [field.index for field in model.get_settings().indexes]
+
+
+def _key(spec) -> tuple:
+    return tuple((field, direction) for field, direction in spec.items())
+
+
+def _identity(key, collation) -> tuple:
+    """
+    Key pattern plus collation locale and strength: MongoDB allows the same
+    key pattern once per collation, and a query only uses an index whose
+    collation matches its own.
+    """
+    collation = dict(collation or {})
+    return _key(dict(key)), collation.get("locale"), collation.get("strength")
+
+
+def _declared_identity(index: IndexModel) -> tuple:
+    document = index.document
+    collation = document.get("collation")
+    if collation is not None and not isinstance(collation, dict):
+        collation = collation.document
+    return _identity(document["key"], collation)
+
+
+async def existing_indexes(model: Type[Document]) -> Dict[str, dict]:
+    """``index_information()`` of the model's collection, by index name"""
+    return await model.get_motor_collection().index_information()
+
+
+def missing_indexes(model: Type[Document], existing: Dict[str, dict]) -> List[IndexModel]:
+    """
+    Declared indexes with no matching key pattern and collation in
+    ``existing``. An index that exists with different uniqueness is
+    reported, not rebuilt, since replacing it needs a manual drop.
+    """
+    by_key: Dict[tuple, dict] = {
+        _identity(info["key"], info.get("collation")): info for info in existing.values()
+    }
+
+    missing = []
+    for index in declared_indexes(model):
+        document = index.document
+        info = by_key.get(_declared_identity(index))
+        if info is None:
+            missing.append(index)
+        elif bool(info.get("unique")) != bool(document.get("unique")):
+            logger.warning(
+                "Index exists with different options; drop it to rebuild",
+                extra={"collection": model.get_collection_name(), "index": document["name"]}
+            )
+    return missing
+
+
+def undeclared_indexes(model: Type[Document], existing: Dict[str, dict]) -> List[str]:
+    """
+    Names of indexes in ``existing`` that the model does not declare (other
+    than ``_id_``), e.g. ones replaced by a collated version. They still cost
+    a write per insert and update, so drop them once nothing relies on them.
+    """
+    declared = {_declared_identity(index) for index in declared_indexes(model)}
+    return sorted(
+        name for name, info in existing.items()
+        if name != "_id_" and _identity(info["key"], info.get("collation")) not in declared
+    )
+
+
+async def _build(plan: Dict[Type[Document], List[IndexModel]]) -> None:
+    for model, indexes in plan.items():
+        collection = model.get_collection_name()
+        try:
+            await model.get_motor_collection().create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error(
+                "Index build failed",
+                extra={"collection": collection, "error": str(e)}
+            )
+        else:
+            logger.info(
+                "Indexes built",
+                extra={"collection": collection, "indexes": [i.document["name"] for i in indexes]}
+            )
+
+
+async def ensure_indexes(models: Sequence[Type[Document]], mode: str = "foreground") -> None:
+    """
+    Build missing indexes for ``models``.
+
+    ``foreground`` waits for the builds, ``background`` schedules them and
+    returns immediately, ``off`` only logs what is missing.
+    """
+    global _background_task
+    if mode not in INDEX_BUILD_MODES:
+        raise ValueError(f"Unknown index build mode: {mode}")
+
+    plan = {}
+    for model in models:
+        existing = await existing_indexes(model)
+        missing = missing_indexes(model, existing)
+        if missing:
+            plan[model] = missing
+        stale = undeclared_indexes(model, existing)
+        if stale:
+            logger.warning(
+                "Undeclared indexes; drop them if nothing relies on them",
+                extra={"collection": model.get_collection_name(), "indexes": stale}
+            )
+    if not plan:
+        return
+
+    names = {m.get_collection_name(): [i.document["name"] for i in idx] for m, idx in plan.items()}
+    logger.info("Missing indexes", extra={"missing": names, "mode": mode})
+    if mode == "foreground":
+        await _build(plan)
+    elif mode == "background":
+        _background_task = asyncio.create_task(_build(plan))
+
+
+async def cancel_background_build() -> None:
+    """Stop waiting on a background build (the server keeps building it)"""
+    global _background_task
+    if _background_task is not None and not _background_task.done():
+        _background_task.cancel()
+        try:
+            await _background_task
+        except asyncio.CancelledError:
+            pass
+    _background_task = None
@@ -3,7 +3,7 @@ import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from dotenv import load_dotenv
-from models import User, Task  # Adjust import based on your project structure
+from app.models import User, Task, TaskVersion, RefreshSession  # Run as `python -m app.init_db` from the project root
 
 load_dotenv()
 
@@ -14,7 +14,7 @@ async def init_db():
     client = AsyncIOMotorClient(MONGODB_URL)
     await init_beanie(
         database=client[DB_NAME],
-        document_models=[User, Task]
+        document_models=[User, Task, TaskVersion, RefreshSession]
     )
     print("MongoDB initialized with Beanie models.")
 
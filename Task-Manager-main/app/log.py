@@ -0,0 +1,248 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi.routing import APIRoute
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from dotenv import load_dotenv
+import asyncio
+import atexit
+import copy
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "500"))
+
+# --- Per-request context ---
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+timings_var: ContextVar[Optional[Dict[str, float]]] = ContextVar("timings", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the wall time spent in the block to the current request's timings"""
+    timings = timings_var.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings[phase] = round(timings.get(phase, 0.0) + elapsed, 3)
+
+
+# --- Formatting and filtering ---
+
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are emitted as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # formatted by StructuredQueueHandler
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the active request id"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a ``LOG_SAMPLE_RATE`` fraction of records marked ``_sampled=True``.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "_sampled", False):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps the traceback apart from the message. The
+    default ``prepare`` formats it into ``msg`` and clears ``exc_info``, so
+    JsonFormatter would never see it; here it travels as ``exc_text``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route all logging through a queue so request handlers never block on
+    stdout; a background thread does the actual writing. Safe to call twice.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(SamplingFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.addHandler(queue_handler)
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+# --- Request timing ---
+
+request_logger = logging.getLogger("app.request")
+
+
+class RequestContextMiddleware:
+    """
+    Assigns each HTTP request an id (honouring an incoming X-Request-ID),
+    returns it as X-Request-ID and logs one timing record per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        timings: Dict[str, float] = {}
+        id_token = request_id_var.set(request_id)
+        timings_token = timings_var.set(timings)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"].append((b"x-request-id", request_id.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            path = getattr(scope.get("route"), "path", scope["path"])
+            level = logging.WARNING if status_code >= 500 else logging.INFO
+            request_logger.log(
+                level,
+                "%s %s %s %.1fms",
+                scope["method"], path, status_code, duration_ms,
+                extra={
+                    "method": scope["method"],
+                    "path": path,
+                    "status": status_code,
+                    "duration_ms": duration_ms,
+                    "timings": timings,
+                    "_sampled": duration_ms < LOG_SLOW_REQUEST_MS,
+                },
+            )
+            request_id_var.reset(id_token)
+            timings_var.reset(timings_token)
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records ``handler`` (endpoint body) and ``serialization``
+    timings. Serialization is the route time not spent in the endpoint or in
+    the auth phases, i.e. request parsing plus response validation/encoding.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        # include_router() rebuilds routes from the already wrapped endpoint
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "_timed", False):
+            original = endpoint
+
+            @functools.wraps(original)
+            async def endpoint(*args, **kw):
+                with timed("handler"):
+                    return await original(*args, **kw)
+
+            endpoint._timed = True
+
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            response = await handler(request)
+            timings = timings_var.get()
+            if timings is not None:
+                total = (time.perf_counter() - start) * 1000
+                accounted = sum(
+                    timings.get(phase, 0.0) for phase in ("handler", "jwt_decode", "user_lookup")
+                )
+                timings["serialization"] = round(max(total - accounted, 0.0), 3)
+            return response
+
+        return timed_handler
@@ -1,27 +1,41 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
-from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
 from dotenv import load_dotenv
 import os
-from typing import Optional
+import time
 
 # Import models and routers
-from app.models import User, Task, HTTPError
-from app.routers import auth, tasks, users
-from app.database import init_db, close_db, get_database
+from app.models import HTTPError
+from app.routers import auth, tasks, users, system
+from app.database import init_db, close_db
+from app.hashing import hashing_pool
+from app.heartbeat import heartbeat, readiness
+from app.events import task_events
+from app.log import setup_logging, RequestContextMiddleware, timings_var, timed
+from app.metrics import registry, MetricsMiddleware
+from app.responses import ORJSONResponse
+from app.compression import CompressionMiddleware
+import logging
 
 # Load environment variables
 load_dotenv()
 
+setup_logging()
+logger = logging.getLogger("app.main")
+
 # Application lifespan
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Startup phases are recorded with timed() like request phases
+    startup_timings = {}
+    token = timings_var.set(startup_timings)
+    start = time.perf_counter()
+
     # Initialize the database and Beanie first!
     await init_db()
 
@@ -29,21 +43,26 @@ async def lifespan(app: FastAPI):
     required_vars = ["MONGODB_URL", "DB_NAME", "SECRET_KEY"]
     missing_vars = [var for var in required_vars if not os.getenv(var)]
     if missing_vars:
-        print(f"⚠️ WARNING: Missing environment variables: {', '.join(missing_vars)}")
-        if "SECRET_KEY" in missing_vars:
-            print("⚠️ WARNING: Using temporary SECRET_KEY for development")
-
-    # Now it's safe to create indexes
-    try:
-        await User.get_motor_collection().create_index("email", unique=True)
-        await User.get_motor_collection().create_index("username", unique=True)
-        await Task.get_motor_collection().create_index("owner_id")
-    except Exception as e:
-        print(f"Warning: Index creation failed - {str(e)}")
+        logger.warning("Missing environment variables", extra={"missing": missing_vars})
+
+    # First DB check runs inline so readiness is accurate from the start
+    with timed("heartbeat"):
+        await heartbeat.check()
+
+    timings_var.reset(token)
+    heartbeat.start()
+    await task_events.start()
+    logger.info(
+        "Startup complete",
+        extra={"duration_ms": round((time.perf_counter() - start) * 1000, 3), "timings": startup_timings}
+    )
 
     yield
 
     # Shutdown
+    await task_events.stop()
+    await heartbeat.stop()
+    hashing_pool.shutdown()
     await close_db()
 
 # Initialize FastAPI app
@@ -52,6 +71,7 @@ app = FastAPI(
     description="A complete task management system with user authentication",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     responses={
         400: {"model": HTTPError},
         401: {"model": HTTPError},
@@ -68,9 +88,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"]
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag", "Last-Modified"]
 )
 
+# Negotiated brotli/gzip compression for bodies over COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Per-route request metrics
+app.add_middleware(MetricsMiddleware)
+
+# Request ids and per-request timing logs (outermost, so it times everything)
+app.add_middleware(RequestContextMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -86,18 +115,31 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         headers=exc.headers if hasattr(exc, "headers") else None
     )
 
-# Health check endpoint
+# Health check endpoints (served from the cached heartbeat, never hit the DB)
 @app.get("/health", tags=["System"])
 async def health_check():
-    try:
-        db = await get_database()
-        await db.command("ping")
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
+    if not heartbeat.db_healthy:
         raise HTTPException(
-            status_code=500,
-            detail=f"Database connection failed: {str(e)}"
+            status_code=503,
+            detail=f"Database connection failed: {heartbeat.db_error or 'heartbeat is stale'}"
         )
+    return {"status": "healthy", "database": "connected", "latency_ms": heartbeat.db_latency_ms}
+
+@app.get("/health/live", tags=["System"])
+async def liveness():
+    """The process is up and the event loop is serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready", tags=["System"])
+async def readiness_check():
+    """Database heartbeat, event-loop lag and connection pool saturation"""
+    report = readiness()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+# Metrics endpoint (Prometheus text exposition format)
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 # Root endpoint
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
@@ -133,6 +175,13 @@ app.include_router(
     dependencies=[Depends(auth.get_current_user)]
 )
 
+app.include_router(
+    system.router,
+    prefix="/internal",
+    tags=["System"],
+    include_in_schema=False
+)
+
 # OpenAPI schema customization
 def custom_openapi():
     if app.openapi_schema:
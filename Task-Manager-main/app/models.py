@@ -1,17 +1,39 @@
-from beanie import Document
+from beanie import Document, after_event, Replace, Save, SaveChanges, Update, Delete
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+import os
 import re
 
+from .cache import invalidate_user
+
+MAX_BULK_OPERATIONS = int(os.getenv("MAX_BULK_OPERATIONS", "5000"))
+
 # --- Enums ---
 class Priority(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
 
+class TaskSort(str, Enum):
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    DUE_DATE = "due_date"
+    DUE_DATE_DESC = "-due_date"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 # --- Database Models ---
+
+# Emails and usernames are unique and matched regardless of case. Queries on
+# them must pass this collation too, or MongoDB cannot use their indexes.
+CASE_INSENSITIVE = Collation(locale="en", strength=2)
+
 class User(Document):
     email: EmailStr
     username: str = Field(..., min_length=1, max_length=50)
@@ -24,10 +46,16 @@ class User(Document):
     class Settings:
         name = "users"
         indexes = [
-            "email",  # Default index
-            "username"  # Default index
+            IndexModel([("email", ASCENDING)], unique=True, collation=CASE_INSENSITIVE, name="email_ci"),
+            IndexModel([("username", ASCENDING)], unique=True, collation=CASE_INSENSITIVE, name="username_ci"),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)])  # Keyset pagination
         ]
 
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_cache(self):
+        """Drop this user from the auth cache whenever it is changed or removed"""
+        invalidate_user(self)
+
     class Config:
         schema_extra = {
             "example": {
@@ -51,10 +79,15 @@ class Task(Document):
     class Settings:
         name = "tasks"
         indexes = [
-            "owner_id",
-            "completed",
-            "due_date",
-            "priority"
+            # One index per (filter, sort) shape served by read_tasks:
+            # equality fields first, then the sort key, then _id for keyset paging.
+            # Each starts with owner_id, so owner-only queries use them too.
+            IndexModel([("owner_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("owner_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("owner_id", ASCENDING), ("completed", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("owner_id", ASCENDING), ("completed", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("owner_id", ASCENDING), ("priority", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("owner_id", ASCENDING), ("priority", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)]),
         ]
 
     class Config:
@@ -69,12 +102,48 @@ class Task(Document):
             }
         }
 
+class TaskVersion(Document):
+    """
+    Per-user version of the task collection, bumped by every task mutation.
+    Lets list reads answer conditional requests without scanning tasks.
+    """
+    id: str  # User.id of the task owner
+    version: int = 0
+    modified_at: Optional[datetime] = None
+
+    class Settings:
+        name = "task_versions"
+
+class RefreshSession(Document):
+    """
+    Server side record of a refresh token. Deleting it revokes the token;
+    MongoDB removes it by itself once it expires (TTL index).
+    """
+    id: str  # SHA-256 of the refresh token, never the token itself
+    user_id: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+    class Settings:
+        name = "sessions"
+        indexes = [
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("user_id", ASCENDING)])  # Revoking every session of a user
+        ]
+
 # --- Authentication Models ---
 class UserCreate(BaseModel):
     email: EmailStr
     username: str = Field(..., min_length=1, max_length=50)
     password: str = Field(..., min_length=1)
 
+    @validator("username")
+    def username_is_not_an_email(cls, v):
+        # Login tells emails and usernames apart by the "@"
+        if "@" in v:
+            raise ValueError("username must not contain @")
+        return v
+
 class UserResponse(BaseModel):
     id: str
     email: EmailStr
@@ -82,11 +151,6 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 class UserInDB(UserResponse):
     hashed_password: str
 
@@ -98,8 +162,12 @@ class TokenData(BaseModel):
     email: Optional[EmailStr] = None
 
 class TokenResponse(Token):
+    refresh_token: str
     user: UserResponse
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 # --- Task Models ---
 class TaskCreate(BaseModel):
     title: str = Field(..., min_length=3, max_length=100)
@@ -107,6 +175,10 @@ class TaskCreate(BaseModel):
     priority: Priority = Priority.MEDIUM
     due_date: Optional[datetime] = None
 
+class TaskImport(TaskCreate):
+    """A row of an import file; unlike a new task it may already be completed"""
+    completed: bool = False
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=3, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
@@ -125,10 +197,70 @@ class TaskResponse(BaseModel):
     updated_at: Optional[datetime]
     owner_id: str
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+class PriorityCounts(BaseModel):
+    low: int = 0
+    medium: int = 0
+    high: int = 0
+
+class TaskStats(BaseModel):
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    by_priority: PriorityCounts
+
+class BulkOperationType(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class BulkTaskOperation(BaseModel):
+    op: BulkOperationType
+    id: Optional[str] = None
+    task: Optional[TaskCreate] = None
+    changes: Optional[TaskUpdate] = None
+
+    @validator("task", always=True)
+    def task_required_for_create(cls, v, values):
+        if values.get("op") == BulkOperationType.CREATE and v is None:
+            raise ValueError("task is required for create operations")
+        return v
+
+    @validator("changes", always=True)
+    def check_target(cls, v, values):
+        op = values.get("op")
+        if op in (BulkOperationType.UPDATE, BulkOperationType.DELETE) and not values.get("id"):
+            raise ValueError(f"id is required for {op.value} operations")
+        if op == BulkOperationType.UPDATE and v is None:
+            raise ValueError("changes is required for update operations")
+        return v
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskOperation] = Field(..., min_items=1, max_items=MAX_BULK_OPERATIONS)
+    ordered: bool = True
+
+class BulkTaskResult(BaseModel):
+    index: int
+    op: BulkOperationType
+    id: Optional[str] = None
+    status: str  # created | updated | deleted | not_found | error | skipped
+    detail: Optional[str] = None
+
+class BulkTaskResponse(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[BulkTaskResult]
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+class TaskImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[TaskImportError] = []
 
 # --- Utility Models ---
 class Message(BaseModel):
@@ -143,7 +275,11 @@ class HTTPError(BaseModel):
         }
 
 __all__ = [
-    'User', 'Task', 'UserCreate', 'UserResponse', 'UserInDB',
-    'Token', 'TokenData', 'TokenResponse', 'TaskCreate',
-    'TaskUpdate', 'TaskResponse', 'Priority', 'Message', 'HTTPError'
+    'User', 'Task', 'TaskVersion', 'RefreshSession', 'UserCreate', 'UserResponse', 'UserInDB',
+    'Token', 'TokenData', 'TokenResponse', 'RefreshRequest', 'TaskCreate',
+    'TaskUpdate', 'TaskResponse', 'PriorityCounts', 'TaskStats',
+    'BulkOperationType', 'BulkTaskOperation', 'BulkTaskRequest',
+    'BulkTaskResult', 'BulkTaskResponse', 'TaskImportError',
+    'TaskImportResult', 'Priority', 'TaskSort', 'ExportFormat',
+    'Message', 'HTTPError'
 ]
\ No newline at end of file
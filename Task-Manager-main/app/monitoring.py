@@ -0,0 +1,135 @@
+from pymongo import monitoring
+from .metrics import (
+    registry, CallbackCounter, CallbackGauge, mongodb_command_duration_seconds, mongodb_command_failures_total
+)
+import threading
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool activity from pymongo's CMAP monitoring events.
+
+    Callbacks fire on driver threads, so counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.created = 0
+        self.closed = 0
+        self.checkout_started = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event):
+        self._incr("pools")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr("pool_cleared")
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools -= 1
+
+    def connection_created(self, event):
+        self._incr("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr("closed")
+
+    def connection_check_out_started(self, event):
+        self._incr("checkout_started")
+
+    def connection_check_out_failed(self, event):
+        self._incr("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._incr("checked_out")
+
+    def connection_checked_in(self, event):
+        self._incr("checked_in")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "open": self.created - self.closed,
+                "in_use": self.checked_out - self.checked_in,
+                "waiting": self.checkout_started - self.checked_out - self.checkout_failed,
+                "total_created": self.created,
+                "total_closed": self.closed,
+                "total_checkouts": self.checked_out,
+                "total_checkout_failures": self.checkout_failed,
+                "pool_clears": self.pool_cleared,
+            }
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """
+    Feeds per-collection, per-command latency into the metrics registry.
+
+    The collection name is only present on the started event, so it is kept
+    keyed by (connection, request id) until the command finishes.
+    """
+
+    def __init__(self):
+        self._collections = {}
+
+    @staticmethod
+    def _key(event):
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = event.command.get("collection", "")
+        self._collections[self._key(event)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(self._key(event), "")
+        mongodb_command_duration_seconds.observe(
+            event.duration_micros / 1_000_000, collection, event.command_name
+        )
+
+    def failed(self, event):
+        collection = self._collections.pop(self._key(event), "")
+        mongodb_command_duration_seconds.observe(
+            event.duration_micros / 1_000_000, collection, event.command_name
+        )
+        mongodb_command_failures_total.inc(collection, event.command_name)
+
+
+pool_stats = PoolStatsListener()
+command_timings = CommandTimingListener()
+
+for _field, _help in (
+    ("open", "Open MongoDB connections"),
+    ("in_use", "MongoDB connections checked out"),
+    ("waiting", "Operations waiting for a MongoDB connection"),
+):
+    registry.register(CallbackGauge(
+        f"mongodb_pool_{_field}", _help, lambda field=_field: pool_stats.snapshot()[field]
+    ))
+
+for _name, _field, _help in (
+    ("connections_created", "total_created", "MongoDB connections created"),
+    ("connections_closed", "total_closed", "MongoDB connections closed"),
+    ("checkouts", "total_checkouts", "MongoDB connection checkouts"),
+    ("checkout_failures", "total_checkout_failures", "MongoDB connection checkouts that failed"),
+    ("clears", "pool_clears", "MongoDB connection pool clears"),
+):
+    registry.register(CallbackCounter(
+        f"mongodb_pool_{_name}_total", _help, lambda field=_field: pool_stats.snapshot()[field]
+    ))
@@ -0,0 +1,76 @@
+from fastapi import HTTPException, status
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING
+from typing import Any, List, Optional, Tuple
+from dotenv import load_dotenv
+import base64
+import os
+
+load_dotenv()
+
+# Upper bound for the ``limit`` query parameter of paginated endpoints
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# --- Opaque keyset cursors ---
+#
+# A cursor records the sort key value and _id of the last document on a page.
+# The next page is everything strictly after that pair in sort order, which
+# Mongo answers with an index seek instead of walking skipped documents.
+
+def encode_cursor(value: Any, doc_id: Any) -> str:
+    """Encode the (sort value, _id) pair of the last document on a page"""
+    raw = json_util.dumps({"v": value, "id": doc_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        return data["v"], data["id"]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def sort_spec(field: str, direction: int = ASCENDING) -> List[Tuple[str, int]]:
+    """Sort on ``field`` with ``_id`` as the tie breaker"""
+    return [(field, direction), ("_id", direction)]
+
+def keyset_filter(field: str, direction: int, value: Any, doc_id: Any) -> dict:
+    """
+    Filter for documents that sort strictly after (value, doc_id).
+
+    Mongo sorts null/missing before any date, so nulls come first when
+    ascending and last when descending.
+    """
+    id_op = "$gt" if direction == ASCENDING else "$lt"
+    if value is None:
+        if direction == ASCENDING:
+            return {"$or": [
+                {field: None, "_id": {"$gt": doc_id}},
+                {field: {"$ne": None}},
+            ]}
+        return {field: None, "_id": {"$lt": doc_id}}
+
+    conditions = [
+        {field: {id_op: value}},
+        {field: value, "_id": {id_op: doc_id}},
+    ]
+    if direction == DESCENDING:
+        conditions.append({field: None})
+    return {"$or": conditions}
+
+def page_cursor(documents: List[dict], limit: int, field: str) -> Optional[str]:
+    """
+    Trim a page of raw documents fetched with ``limit + 1`` and return the
+    next cursor, if any.
+    """
+    if limit < 1:
+        raise ValueError(f"Page limit must be at least 1, got {limit}")
+    if len(documents) <= limit:
+        return None
+    del documents[limit:]
+    last = documents[-1]
+    return encode_cursor(last.get(field), last["_id"])
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from .metrics import registry, Counter
+import logging
+import math
+import os
+import time
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis is optional; buckets stay in process memory
+    redis = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Token buckets ---
+#
+# A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+# second; every attempt takes one. Buckets live in process memory unless
+# RATE_LIMIT_REDIS_URL points at a Redis-compatible server, in which case all
+# workers share them. If that server fails, limiting falls back to memory.
+
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_REDIS_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", "0.2"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+class Rate(NamedTuple):
+    capacity: float
+    rate: float  # tokens added per second
+
+
+def parse_rate(value: str) -> Optional[Rate]:
+    """Parse ``"10/minute"`` style limits; empty or ``off`` disables the limit"""
+    value = value.strip().lower()
+    if value in ("", "off"):
+        return None
+    count, _, period = value.partition("/")
+    if period not in _PERIODS or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. 10/minute")
+    return Rate(float(count), int(count) / _PERIODS[period])
+
+
+class MemoryBuckets:
+    """Buckets of this process, at most ``maxsize`` keys (least recently used go first)"""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def take(self, key: str, limit: Rate) -> float:
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Same algorithm as MemoryBuckets.take, run atomically on the server with its
+# clock so every worker sees one bucket per key
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by every worker through a Redis-compatible server"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self._client = redis.from_url(
+            url,
+            socket_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+        )
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: Rate) -> float:
+        return float(await self._take(keys=[f"ratelimit:{key}"], args=[limit.capacity, limit.rate]))
+
+
+rate_limited_total = registry.register(Counter(
+    "rate_limited_total", "Requests rejected by a rate limit", ("scope",)
+))
+
+
+class RateLimiter:
+    """Token buckets per key, with the shared backend falling back to memory on errors"""
+
+    def __init__(self, redis_url: Optional[str] = RATE_LIMIT_REDIS_URL):
+        self.memory = MemoryBuckets()
+        self.shared = RedisBuckets(redis_url) if redis_url else None
+
+    async def take(self, key: str, limit: Rate) -> float:
+        if self.shared is not None:
+            try:
+                return await self.shared.take(key, limit)
+            except Exception as e:
+                logger.warning("Shared rate limit store failed, using process memory", extra={"error": str(e)})
+        return await self.memory.take(key, limit)
+
+    async def enforce(self, scope: str, key: str, limit: Optional[Rate]) -> None:
+        """Raise 429 with Retry-After once ``key`` has used up ``limit``"""
+        if limit is None:
+            return
+        wait = await self.take(f"{scope}:{key}", limit)
+        if wait > 0:
+            rate_limited_total.inc(scope)
+            logger.info("Rate limited", extra={"scope": scope, "retry_after_s": round(wait, 3)})
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+
+def client_address(request: Request) -> str:
+    """
+    Address of the client. Behind a proxy this is only the real client if the
+    server trusts its X-Forwarded-For (uvicorn/gunicorn ``forwarded_allow_ips``).
+    """
+    return request.client.host if request.client else "unknown"
+
+
+rate_limiter = RateLimiter()
+
+# Login attempts per client address and per submitted account name. Both are
+# checked before the user lookup and the password hash.
+LOGIN_RATE_LIMIT_IP = parse_rate(os.getenv("LOGIN_RATE_LIMIT_IP", "20/minute"))
+LOGIN_RATE_LIMIT_ACCOUNT = parse_rate(os.getenv("LOGIN_RATE_LIMIT_ACCOUNT", "10/minute"))
@@ -0,0 +1,30 @@
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from bson import ObjectId
+from typing import Any
+import orjson
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for types it does not serialize natively"""
+    if isinstance(value, BaseModel):
+        # Beanie documents and API models, keyed the way FastAPI would (by alias)
+        return value.dict(by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Datetimes, enums and UUIDs are
+    handled natively and models/documents through ``_default``, so routes
+    may return documents in it directly and skip ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
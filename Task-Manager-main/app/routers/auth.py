@@ -1,45 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import JWTError
 from typing import Optional
-from ..models import User, UserCreate, UserResponse, TokenResponse
-from dotenv import load_dotenv
-import os
-import traceback
+from pymongo.errors import DuplicateKeyError
+from ..models import User, UserCreate, UserResponse, TokenResponse, RefreshRequest, CASE_INSENSITIVE
+from ..cache import user_cache
+from ..hashing import pwd_context, hashing_pool
+from ..log import TimedRoute, timed
+from ..tokens import create_token, decode_token
+from ..ratelimit import rate_limiter, client_address, LOGIN_RATE_LIMIT_IP, LOGIN_RATE_LIMIT_ACCOUNT
+from ..sessions import create_session, consume_session, revoke_session, revoke_user_sessions
+import logging
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["Authentication"])
+router = APIRouter(tags=["Authentication"], route_class=TimedRoute)
 
 # Security configurations
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-# JWT configurations
-SECRET_KEY = os.getenv("SECRET_KEY")
-if not SECRET_KEY:
-    raise ValueError("SECRET_KEY must be set in environment variables")
-ALGORITHM = "HS256"
+# JWT configurations (signing keys live in app/tokens.py)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # --- Utility Functions ---
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hashed version"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate a hashed version of the password"""
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return create_token(data, expires_delta or timedelta(minutes=15))
+
+def _login_filter(identifier: str) -> dict:
+    """Point lookup for a login name: emails contain "@" and usernames cannot"""
+    return {"email" if "@" in identifier else "username": identifier}
+
+async def _signup_conflict(user_data: UserCreate) -> Optional[str]:
+    """
+    Why the email or username cannot be registered, if either is taken.
+    One collated point lookup each on the unique indexes, so a duplicate
+    signup is rejected before it costs a password hash.
+    """
+    collection = User.get_motor_collection()
+    if await collection.find_one({"email": user_data.email}, {"_id": 1}, collation=CASE_INSENSITIVE):
+        return "Email already registered"
+    if await collection.find_one({"username": user_data.username}, {"_id": 1}, collation=CASE_INSENSITIVE):
+        return "Username already taken"
+    return None
+
+async def upgrade_password_hash(user: User, new_hash: str) -> None:
+    """Store a hash made with the current scheme and parameters; the login goes ahead even if this fails"""
+    try:
+        with timed("db_query"):
+            await user.set({User.hashed_password: new_hash})
+        logger.info("Password hash upgraded", extra={"user_id": str(user.id), "scheme": pwd_context.identify(new_hash)})
+    except Exception as e:
+        logger.warning("Password hash upgrade failed", extra={"user_id": str(user.id), "error": str(e)})
+
+async def create_token_response(user: User) -> dict:
+    """Access token, a new refresh session and the user, as returned by every login route"""
+    access_token = create_access_token(
+        data={"sub": user.email},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    with timed("db_query"):
+        refresh_token = await create_session(str(user.id))
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "user": UserResponse(
+            id=str(user.id),
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            created_at=user.created_at
+        ).dict()
+    }
+
+def ensure_hashing_capacity() -> None:
+    """Turn password work away with 503 while the hashing queue is full"""
+    if hashing_pool.saturated:
+        logger.warning("Password hashing saturated", extra={"waiting": hashing_pool.waiting})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
 
 # --- Authentication Dependencies ---
 
@@ -51,16 +96,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed("jwt_decode"):
+            payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError as e:
+    except JWTError:
         raise credentials_exception
 
-    user = await User.find_one(User.email == email)
-    if user is None:
-        raise credentials_exception
+    with timed("user_lookup"):
+        user = user_cache.get(email)
+        if user is None:
+            user = await User.find_one(User.email == email, collation=CASE_INSENSITIVE)
+            if user is None:
+                raise credentials_exception
+            user_cache.set(email, user)
     return user
 
 # --- Authentication Routes ---
@@ -68,120 +118,147 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
     """Register a new user"""
+    ensure_hashing_capacity()
     try:
-        print(f"Attempting to create user with email: {user_data.email} and username: {user_data.username}")
-        
-        # Check for existing user with same email or username
-        existing_user = await User.find_one(
-            {"$or": [
-                {"email": user_data.email},
-                {"username": user_data.username}
-            ]}
-        )
-        
-        if existing_user:
-            detail = "Email already registered" if existing_user.email == user_data.email else "Username already taken"
-            print(f"User creation failed: {detail}")
+        with timed("db_query"):
+            detail = await _signup_conflict(user_data)
+        if detail:
+            logger.info("Signup rejected", extra={"reason": detail})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=detail
             )
 
-        # Create new user
+        # Create new user; the unique indexes still catch a concurrent signup
+        with timed("password_hash"):
+            hashed_password = await hashing_pool.hash(user_data.password)
         new_user = User(
             email=user_data.email,
             username=user_data.username,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=hashed_password,
             is_active=True,
             created_at=datetime.utcnow()
         )
-        
-        print("Creating new user in database...")
-        await new_user.create()
-        print("User created successfully")
-
-        # Generate access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": new_user.email},
-            expires_delta=access_token_expires
-        )
-        print("Access token generated successfully")
-
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": UserResponse(
-                id=str(new_user.id),
-                email=new_user.email,
-                username=new_user.username,
-                is_active=new_user.is_active,
-                created_at=new_user.created_at
-            ).dict()
-        }
+
+        try:
+            with timed("db_query"):
+                await new_user.create()
+        except DuplicateKeyError as e:
+            key_pattern = (e.details or {}).get("keyPattern", {})
+            detail = "Username already taken" if "username" in key_pattern else "Email already registered"
+            logger.info("Signup rejected", extra={"reason": detail})
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+        logger.info("User created", extra={"user_id": str(new_user.id)})
+
+        return await create_token_response(new_user)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Unexpected error during signup: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Unexpected error during signup")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed: {str(e)}"
         )
 
 @router.post("/token", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Authenticate user and return access token"""
+    # Throttle before any database or bcrypt work
+    await rate_limiter.enforce("login_ip", client_address(request), LOGIN_RATE_LIMIT_IP)
+    await rate_limiter.enforce("login_account", form_data.username.strip().lower(), LOGIN_RATE_LIMIT_ACCOUNT)
+    ensure_hashing_capacity()
     try:
-        print(f"Login attempt for: {form_data.username}")
-        user = await User.find_one(
-            {"$or": [
-                {"email": form_data.username},
-                {"username": form_data.username}
-            ]}
-        )
-        print(f"User found: {user is not None}")
+        with timed("db_query"):
+            user = await User.find_one(_login_filter(form_data.username), collation=CASE_INSENSITIVE)
+            if user is None and "@" in form_data.username:
+                # Usernames created before "@" was disallowed
+                user = await User.find_one({"username": form_data.username}, collation=CASE_INSENSITIVE)
+        password_matches, new_hash = False, None
         if user:
-            print(f"Stored hash: {user.hashed_password}")
-            print(f"Password provided: {form_data.password}")
-            password_matches = verify_password(form_data.password, user.hashed_password)
-            print(f"Password matches: {password_matches}")
-        else:
-            print("No user found with that email/username.")
-
-        if not user or not verify_password(form_data.password, user.hashed_password):
+            with timed("password_verify"):
+                password_matches, new_hash = await hashing_pool.verify_and_update(
+                    form_data.password, user.hashed_password
+                )
+
+        if not password_matches:
+            logger.info("Login failed", extra={"user_found": user is not None})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email},
-            expires_delta=access_token_expires
+        if new_hash:
+            await upgrade_password_hash(user, new_hash)
+        return await create_token_response(user)
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Unexpected error during login")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Login failed. Please try again."
         )
 
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": UserResponse(
-                id=str(user.id),
-                email=user.email,
-                username=user.username,
-                is_active=user.is_active,
-                created_at=user.created_at
-            ).dict()
-        }
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token without the password.
+    The refresh token is single use; the response carries its replacement.
+    """
+    try:
+        with timed("db_query"):
+            session = await consume_session(request.refresh_token)
+            user = await User.get(session["user_id"]) if session else None
+        if user is None:
+            logger.info("Refresh rejected", extra={"session_found": session is not None})
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return await create_token_response(user)
 
     except HTTPException:
         raise
-    except Exception as e:
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Unexpected error during token refresh")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Login failed. Please try again."
+            detail="Token refresh failed. Please log in again."
+        )
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest):
+    """Revoke a refresh token. Access tokens already issued stay valid until they expire."""
+    try:
+        with timed("db_query"):
+            await revoke_session(request.refresh_token)
+    except Exception:
+        logger.exception("Unexpected error during logout")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Logout failed"
+        )
+
+@router.delete("/sessions")
+async def revoke_sessions(current_user: User = Depends(get_current_user)):
+    """Revoke every refresh token of the current user (log out everywhere)"""
+    try:
+        with timed("db_query"):
+            revoked = await revoke_user_sessions(str(current_user.id))
+        logger.info("Sessions revoked", extra={"user_id": str(current_user.id), "revoked": revoked})
+        return {"revoked": revoked}
+    except Exception:
+        logger.exception("Unexpected error revoking sessions")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not revoke sessions"
         )
 
 __all__ = ["router", "get_current_user"]
\ No newline at end of file
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+from dotenv import load_dotenv
+from ..hashing import hashing_pool
+from ..monitoring import pool_stats
+from .. import database
+from ..log import TimedRoute
+import hmac
+import os
+
+load_dotenv()
+
+# Internal endpoints are disabled unless a token is configured
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+def require_internal_token(authorization: Optional[str] = Header(None)):
+    """404 while INTERNAL_API_TOKEN is unset, 401 without ``Bearer <INTERNAL_API_TOKEN>``"""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal API token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_internal_token)])
+
+@router.get("/hashing")
+async def hashing_stats():
+    """Queue and latency statistics for the password hashing pool"""
+    return hashing_pool.stats()
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """MongoDB connection pool usage alongside the configured pool options"""
+    return {
+        "stats": pool_stats.snapshot(),
+        "options": database.client_options(),
+    }
@@ -1,11 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 from .. import models
 from ..routers.auth import get_current_user
-from pydantic import BaseModel
+from ..log import TimedRoute, timed
+from ..cache import task_stats_cache, task_count_cache
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, keyset_filter, page_cursor, sort_spec
+from ..events import TASK_FIELDS, format_sse, serialize_task, task_events
+from ..conditional import make_etag, not_modified, set_validators
+from ..responses import ORJSONResponse
+from pymongo import ASCENDING, DESCENDING, InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import BaseModel, ValidationError
+import asyncio
+import codecs
+import collections
+import csv
+import io
+import json
+import logging
+import os
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+MAX_IMPORT_ERRORS = int(os.getenv("MAX_IMPORT_ERRORS", "1000"))
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "15"))
+EXPORT_FIELDS = TASK_FIELDS
+# Only the fields TaskResponse needs (_id is always returned)
+TASK_PROJECTION = {field: 1 for field in TASK_FIELDS[1:]}
+# Fields an update may set to null
+NULLABLE_TASK_FIELDS = {"due_date"}
 
 class TaskBase(BaseModel):
     title: str
@@ -25,69 +56,625 @@ class Task(TaskBase):
     class Config:
         orm_mode = True
 
-@router.post("/", response_model=models.Task)
+async def _task_version(owner_id: str) -> dict:
+    """The user's task version document ({} before their first write)"""
+    with timed("db_query"):
+        return await models.TaskVersion.get_motor_collection().find_one({"_id": owner_id}) or {}
+
+async def _tasks_changed(owner_id: str, now: datetime):
+    """
+    Bump the user's task version after a write. ETags and the stats and
+    count caches are keyed by it, so every worker sees the change.
+    """
+    with timed("db_query"):
+        await models.TaskVersion.get_motor_collection().update_one(
+            {"_id": owner_id},
+            {"$inc": {"version": 1}, "$set": {"modified_at": now}},
+            upsert=True
+        )
+
+def _task_query(
+    owner_id: str,
+    completed: Optional[bool] = None,
+    priority: Optional[models.Priority] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None
+) -> dict:
+    """Mongo filter for a user's tasks, shaped to match the compound indexes"""
+    query = {"owner_id": owner_id}
+    if completed is not None:
+        query["completed"] = completed
+    if priority is not None:
+        query["priority"] = priority.value
+    if due_before is not None or due_after is not None:
+        query["due_date"] = {}
+        if due_after is not None:
+            query["due_date"]["$gte"] = due_after
+        if due_before is not None:
+            query["due_date"]["$lt"] = due_before
+    return query
+
+def _task_filter(task_id: str, owner_id: str) -> dict:
+    """Filter matching one of the user's tasks by id; unknown ids resolve to 404"""
+    try:
+        return {"_id": ObjectId(task_id), "owner_id": owner_id}
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+def _new_task_document(task: models.TaskCreate, owner_id: str, now: datetime, completed: bool = False) -> dict:
+    """Raw Mongo document for a new task, matching the fields of models.Task"""
+    return {
+        "_id": ObjectId(),
+        "title": task.title,
+        "description": task.description,
+        "priority": task.priority.value,
+        "due_date": task.due_date,
+        "completed": completed,
+        "created_at": now,
+        "updated_at": now,
+        "owner_id": owner_id,
+    }
+
+def _task_response(document: dict) -> dict:
+    """
+    TaskResponse-shaped dict built straight from a raw (projected) document.
+    Values are left as BSON decoded them; orjson renders datetimes itself.
+    """
+    response = {"id": str(document["_id"])}
+    for field in TASK_FIELDS[1:]:
+        response[field] = document.get(field)
+    return response
+
+def _update_fields(changes: models.TaskUpdate, now: datetime) -> dict:
+    """
+    $set document for the fields a TaskUpdate actually carries. An explicit
+    null only clears ``due_date``; for the required fields it is ignored.
+    """
+    fields = {
+        field: value for field, value in changes.dict(exclude_unset=True).items()
+        if value is not None or field in NULLABLE_TASK_FIELDS
+    }
+    if fields.get("priority") is not None:
+        fields["priority"] = fields["priority"].value
+    fields["updated_at"] = now
+    return fields
+
+async def _stream_export(query: dict, export_format: models.ExportFormat, batch_size: int) -> AsyncIterator[str]:
+    """
+    Yield serialized tasks straight from a Motor cursor, one chunk per batch,
+    so memory use does not grow with the number of tasks exported.
+    """
+    cursor = models.Task.get_motor_collection().find(query).sort(
+        sort_spec("created_at", ASCENDING)
+    ).batch_size(batch_size)
+
+    buffer = io.StringIO()
+    writer = None
+    if export_format == models.ExportFormat.CSV:
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+    rows = 0
+    async for document in cursor:
+        row = serialize_task(document)
+        if writer:
+            row["completed"] = "true" if row["completed"] else "false"
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def _stream_events(owner_id: str) -> AsyncIterator[str]:
+    """Relay the user's task events as SSE, with comment lines to keep proxies from timing out"""
+    queue = task_events.subscribe(owner_id)
+    try:
+        yield "retry: 3000\n\n"
+        yield format_sse({"type": "connected", "source": task_events.mode})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        task_events.unsubscribe(owner_id, queue)
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering more than one chunk"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+class _LineFeed:
+    """
+    Lines handed to a csv reader as they arrive. The reader is only asked for
+    a row once a complete record has been fed, so it never runs dry mid-record.
+    """
+
+    def __init__(self):
+        self.lines = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+async def _iter_csv_rows(lines: AsyncIterator[str]):
+    """
+    Parse CSV with one DictReader over the whole upload, so quoted fields may
+    span lines. Yields (first line number, row dict or error) per record.
+    """
+    feed = _LineFeed()
+    reader = csv.DictReader(feed, strict=True)
+    have_header = False
+    record_start, quotes, line_number = None, 0, 0
+
+    def parse(start: int):
+        nonlocal have_header
+        try:
+            if not have_header:
+                have_header = reader.fieldnames is not None
+                return None
+            record = next(reader)
+        except StopIteration:
+            return None
+        except csv.Error as e:
+            feed.lines.clear()
+            return start, f"Malformed row: {e}"
+        return start, {k: v for k, v in record.items() if k is not None and v not in ("", None)}
+
+    async for line in lines:
+        line_number += 1
+        if record_start is None:
+            if not line.strip():
+                continue
+            record_start = line_number
+        feed.lines.append(line + "\n")
+        # An odd number of quotes so far means a quoted field continues
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        parsed = parse(record_start)
+        record_start, quotes = None, 0
+        if parsed is not None:
+            yield parsed
+    if record_start is not None:  # unterminated quoted field
+        parsed = parse(record_start)
+        if parsed is not None:
+            yield parsed
+
+async def _iter_import_rows(lines: AsyncIterator[str], import_format: models.ExportFormat):
+    """
+    Yield (line number, row dict or error message) for each record; CSV
+    input needs a header row.
+    """
+    if import_format == models.ExportFormat.CSV:
+        async for item in _iter_csv_rows(lines):
+            yield item
+        return
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            yield line_number, f"Malformed row: {e}"
+            continue
+        yield line_number, row
+
+def _parse_sort(sort: models.TaskSort):
+    """Split a sort value such as ``-due_date`` into (field, direction)"""
+    if sort.value.startswith("-"):
+        return sort.value[1:], DESCENDING
+    return sort.value, ASCENDING
+
+def _stats_pipeline(owner_id: str, now: datetime) -> list:
+    return [
+        {"$match": {"owner_id": owner_id}},
+        {"$facet": {
+            "by_priority": [{"$group": {"_id": "$priority", "count": {"$sum": 1}}}],
+            "by_completed": [{"$group": {"_id": "$completed", "count": {"$sum": 1}}}],
+            "overdue": [
+                {"$match": {"completed": False, "due_date": {"$lt": now}}},
+                {"$count": "count"}
+            ],
+        }}
+    ]
+
+async def _count_tasks(owner_id: str, version: int, query: dict) -> int:
+    """Count tasks matching ``query`` on its index, cached per user, task version and filter"""
+    key = (owner_id, version, repr(sorted(query.items())))
+    count = task_count_cache.get(key)
+    if count is None:
+        with timed("db_query"):
+            count = await models.Task.find(query).count()
+        task_count_cache.set(key, count)
+    return count
+
+@router.post("/", response_model=models.TaskResponse)
 async def create_task(task: models.TaskCreate, current_user: models.User = Depends(get_current_user)):
+    owner_id = str(current_user.id)
     try:
-        db_task = models.Task(
-            title=task.title,
-            description=task.description,
-            priority=task.priority,
-            due_date=task.due_date,
-            owner_id=str(current_user.id),
-            created_at=datetime.utcnow()
-        )
-        await db_task.insert()
-        return db_task
-    except Exception as e:
-        print(f"Create task error: {str(e)}")
+        now = datetime.utcnow()
+        document = _new_task_document(task, owner_id, now)
+        with timed("db_query"):
+            await models.Task.get_motor_collection().insert_one(document)
+        await _tasks_changed(owner_id, now)
+        task_events.publish(owner_id, "created", task=serialize_task(document))
+        return _task_response(document)
+    except Exception:
+        logger.exception("Create task error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while creating the task"
         )
 
-@router.get("/", response_model=List[models.Task])
-async def read_tasks(skip: int = 0, limit: int = 100, current_user: models.User = Depends(get_current_user)):
+@router.get("/", response_model=List[models.TaskResponse])
+async def read_tasks(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    completed: Optional[bool] = None,
+    priority: Optional[models.Priority] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    sort: models.TaskSort = models.TaskSort.CREATED_AT,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    List the user's tasks, optionally filtered and sorted on indexed fields.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` (with the
+    same filters and sort) to fetch the next page; ``skip`` is only honoured
+    when no cursor is given.
+
+    The ETag combines the user's task version with the query string, so a
+    matching ``If-None-Match`` gets a 304 without the tasks being read.
+    ``If-Modified-Since`` is ignored here in favour of the ETag.
+    Only the TaskResponse fields are fetched, and the raw documents are
+    rendered by orjson without being parsed into Beanie documents or
+    validated against the response model.
+    """
+    owner_id = str(current_user.id)
+    query = _task_query(owner_id, completed, priority, due_before, due_after)
+    sort_field, direction = _parse_sort(sort)
+    page_query = dict(query)
+    if cursor:
+        page_query = {"$and": [query, keyset_filter(sort_field, direction, *decode_cursor(cursor))]}
+        skip = 0
     try:
-        tasks = await models.Task.find(
-            {"owner_id": str(current_user.id)}
-        ).skip(skip).limit(limit).to_list()
-        return tasks
-    except Exception as e:
-        print(f"Read tasks error: {str(e)}")
+        version = await _task_version(owner_id)
+        etag = make_etag(owner_id, version.get("version", 0), request.url.query)
+        last_modified = version.get("modified_at")
+        # If-Modified-Since only has one-second resolution, so two writes in
+        # the same second would look unchanged; the version ETag is exact.
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        set_validators(response, etag, last_modified)
+
+        with timed("db_query"):
+            tasks = await models.Task.get_motor_collection().find(
+                page_query, TASK_PROJECTION
+            ).sort(sort_spec(sort_field, direction)).skip(skip).limit(limit + 1).to_list(None)
+        next_cursor = page_cursor(tasks, limit, sort_field)
+        response.headers["X-Total-Count"] = str(await _count_tasks(owner_id, version.get("version", 0), query))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return ORJSONResponse([_task_response(t) for t in tasks], headers=dict(response.headers))
+    except Exception:
+        logger.exception("Read tasks error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while fetching tasks"
         )
 
-@router.get("/{task_id}", response_model=models.Task)
-async def read_task(task_id: str, current_user: models.User = Depends(get_current_user)):
+@router.post("/bulk", response_model=models.BulkTaskResponse)
+async def bulk_tasks(request: models.BulkTaskRequest, current_user: models.User = Depends(get_current_user)):
+    """
+    Apply many create/update/delete operations in a single bulk_write.
+
+    With ``ordered`` (the default) processing stops at the first failing
+    operation and the rest are reported as skipped; unordered batches attempt
+    every operation. Update/delete results reflect which of the user's tasks
+    existed when the batch started, adjusted for earlier operations in it.
+    """
+    owner_id = str(current_user.id)
+    now = datetime.utcnow()
+    results = [
+        models.BulkTaskResult(index=i, op=operation.op, id=operation.id, status="skipped")
+        for i, operation in enumerate(request.operations)
+    ]
+
+    try:
+        target_ids = {}
+        for i, operation in enumerate(request.operations):
+            if operation.op != models.BulkOperationType.CREATE:
+                try:
+                    target_ids[i] = ObjectId(operation.id)
+                except (InvalidId, TypeError):
+                    pass
+        existing = set()
+        if target_ids:
+            cursor = models.Task.get_motor_collection().find(
+                {"_id": {"$in": list(set(target_ids.values()))}, "owner_id": owner_id},
+                {"_id": 1}
+            )
+            with timed("db_query"):
+                existing = {doc["_id"] async for doc in cursor}
+
+        requests = []
+        request_index = []  # position in requests -> position in operations
+        for i, operation in enumerate(request.operations):
+            result = results[i]
+            if operation.op == models.BulkOperationType.CREATE:
+                document = _new_task_document(operation.task, owner_id, now)
+                existing.add(document["_id"])
+                result.id = str(document["_id"])
+                result.status = "created"
+                requests.append(InsertOne(document))
+            elif i not in target_ids:
+                result.status = "error"
+                result.detail = "Invalid task id"
+                if request.ordered:
+                    break
+                continue
+            elif target_ids[i] not in existing:
+                result.status = "not_found"
+                continue
+            elif operation.op == models.BulkOperationType.UPDATE:
+                result.status = "updated"
+                requests.append(UpdateOne(
+                    {"_id": target_ids[i], "owner_id": owner_id},
+                    {"$set": _update_fields(operation.changes, now)}
+                ))
+            else:
+                existing.discard(target_ids[i])
+                result.status = "deleted"
+                requests.append(DeleteOne({"_id": target_ids[i], "owner_id": owner_id}))
+            request_index.append(i)
+
+        if requests:
+            try:
+                with timed("db_query"):
+                    await models.Task.get_motor_collection().bulk_write(requests, ordered=request.ordered)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                for error in write_errors:
+                    result = results[request_index[error["index"]]]
+                    result.status = "error"
+                    result.detail = error.get("errmsg")
+                if request.ordered and write_errors:
+                    for position in request_index[write_errors[0]["index"] + 1:]:
+                        results[position].status = "skipped"
+            await _tasks_changed(owner_id, now)
+            task_events.publish(owner_id, "resync")
+    except Exception:
+        logger.exception("Bulk tasks error")
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while applying bulk task operations"
+        )
+
+    counts = {"created": 0, "updated": 0, "deleted": 0, "failed": 0}
+    for result in results:
+        if result.status in counts:
+            counts[result.status] += 1
+        elif result.status == "error":
+            counts["failed"] += 1
+    return models.BulkTaskResponse(**counts, results=results)
+
+@router.get("/export")
+async def export_tasks(
+    format: models.ExportFormat = models.ExportFormat.NDJSON,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000),
+    completed: Optional[bool] = None,
+    priority: Optional[models.Priority] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Stream every matching task as NDJSON or CSV, oldest first"""
+    query = _task_query(str(current_user.id), completed, priority, due_before, due_after)
+    media_type = "application/x-ndjson" if format == models.ExportFormat.NDJSON else "text/csv"
+    return StreamingResponse(
+        _stream_export(query, format, batch_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'}
+    )
+
+@router.post("/import", response_model=models.TaskImportResult)
+async def import_tasks(
+    request: Request,
+    format: models.ExportFormat = models.ExportFormat.NDJSON,
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Import tasks from an NDJSON or CSV request body.
+
+    The body is parsed as it arrives and every row is validated against
+    TaskImport. Valid rows are written with insert_many once ``batch_size``
+    have accumulated; the upload is not read further until that write
+    finishes. Rejected rows are reported by line number.
+    """
+    owner_id = str(current_user.id)
+    collection = models.Task.get_motor_collection()
+    result = models.TaskImportResult()
+    batch, batch_lines = [], []
+
+    def reject(line_number: int, detail: str):
+        result.failed += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(models.TaskImportError(line=line_number, detail=detail))
+
+    async def flush():
+        if not batch:
+            return
+        try:
+            with timed("db_query"):
+                await collection.insert_many(batch, ordered=False)
+            result.imported += len(batch)
+        except BulkWriteError as e:
+            result.imported += e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                reject(batch_lines[error["index"]], error.get("errmsg", "Write failed"))
+        batch.clear()
+        batch_lines.clear()
+
+    now = datetime.utcnow()
+    try:
+        async for line_number, row in _iter_import_rows(_iter_lines(request.stream()), format):
+            if isinstance(row, str):
+                reject(line_number, row)
+                continue
+            try:
+                task = models.TaskImport.parse_obj(row)
+            except ValidationError as e:
+                reject(line_number, "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            batch.append(_new_task_document(task, owner_id, now, task.completed))
+            batch_lines.append(line_number)
+            if len(batch) >= batch_size:
+                await flush()
+        await flush()
+    except Exception:
+        logger.exception("Import tasks error")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Import failed after {result.imported} tasks were imported"
+        )
+    finally:
+        if result.imported:
+            await _tasks_changed(owner_id, now)
+            task_events.publish(owner_id, "resync")
+    return result
+
+@router.get("/stream")
+async def stream_task_events(current_user: models.User = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of the user's task changes: ``created`` and
+    ``updated`` carry the task, ``deleted`` its id, and ``resync`` asks the
+    client to reload (after bulk changes or if it fell behind). A
+    ``connected`` event is sent first; reload after reconnecting.
+    """
+    return StreamingResponse(
+        _stream_events(str(current_user.id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats", response_model=models.TaskStats)
+async def read_task_stats(current_user: models.User = Depends(get_current_user)):
+    """Counts by priority, completion state and overdue status in one aggregation"""
+    owner_id = str(current_user.id)
+    try:
+        cache_key = (owner_id, (await _task_version(owner_id)).get("version", 0))
+        stats = task_stats_cache.get(cache_key)
+        if stats is not None:
+            return stats
+        with timed("db_query"):
+            result = (await models.Task.aggregate(_stats_pipeline(owner_id, datetime.utcnow())).to_list())[0]
+    except Exception:
+        logger.exception("Task stats error")
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while computing task statistics"
+        )
+
+    completed = {row["_id"]: row["count"] for row in result["by_completed"]}
+    stats = models.TaskStats(
+        total=sum(completed.values()),
+        completed=completed.get(True, 0),
+        pending=completed.get(False, 0),
+        overdue=result["overdue"][0]["count"] if result["overdue"] else 0,
+        by_priority=models.PriorityCounts(
+            **{row["_id"]: row["count"] for row in result["by_priority"] if row["_id"]}
+        ),
+    )
+    task_stats_cache.set(cache_key, stats)
+    return stats
+
+@router.get("/{task_id}", response_model=models.TaskResponse)
+async def read_task(
+    task_id: str,
+    request: Request,
+    response: Response,
+    current_user: models.User = Depends(get_current_user)
+):
     try:
-        task = await models.Task.find_one({"_id": task_id, "owner_id": str(current_user.id)})
+        with timed("db_query"):
+            task = await models.Task.get_motor_collection().find_one(
+                _task_filter(task_id, str(current_user.id)), TASK_PROJECTION
+            )
         if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-        return task
-    except Exception as e:
-        print(f"Read task error: {str(e)}")
+
+        last_modified = task.get("updated_at") or task["created_at"]
+        etag = make_etag(task["_id"], last_modified.isoformat())
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        set_validators(response, etag, last_modified)
+        return _task_response(task)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Read task error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while fetching the task"
         )
 
-@router.put("/{task_id}", response_model=models.Task)
+@router.put("/{task_id}", response_model=models.TaskResponse)
 async def update_task(task_id: str, task_update: models.TaskUpdate, current_user: models.User = Depends(get_current_user)):
+    """Apply only the supplied fields with a single find_one_and_update"""
+    owner_id = str(current_user.id)
     try:
-        task = await models.Task.find_one({"_id": task_id, "owner_id": str(current_user.id)})
+        now = datetime.utcnow()
+        with timed("db_query"):
+            task = await models.Task.get_motor_collection().find_one_and_update(
+                _task_filter(task_id, owner_id),
+                {"$set": _update_fields(task_update, now)},
+                projection=TASK_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
         if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-        
-        update_data = task_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
-        
-        await task.save()
-        return task
-    except Exception as e:
-        print(f"Update task error: {str(e)}")
+
+        await _tasks_changed(owner_id, now)
+        task_events.publish(owner_id, "updated", task=serialize_task(task))
+        return _task_response(task)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Update task error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while updating the task"
@@ -95,16 +682,21 @@ async def update_task(task_id: str, task_update: models.TaskUpdate, current_user
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(task_id: str, current_user: models.User = Depends(get_current_user)):
+    owner_id = str(current_user.id)
     try:
-        task = await models.Task.find_one({"_id": task_id, "owner_id": str(current_user.id)})
-        if task is None:
+        with timed("db_query"):
+            result = await models.Task.get_motor_collection().delete_one(_task_filter(task_id, owner_id))
+        if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Task not found")
-        
-        await task.delete()
+
+        await _tasks_changed(owner_id, datetime.utcnow())
+        task_events.publish(owner_id, "deleted", id=task_id)
         return {"ok": True}
-    except Exception as e:
-        print(f"Delete task error: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Delete task error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while deleting the task"
-        ) 
\ No newline at end of file
+        )
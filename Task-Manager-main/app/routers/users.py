@@ -1,21 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from .. import models
 from .auth import get_current_user
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, keyset_filter, page_cursor, sort_spec
+from ..log import TimedRoute, timed
+from ..responses import ORJSONResponse
+from pymongo import ASCENDING
+from bson import ObjectId
+import logging
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+USER_FIELDS = ["email", "username", "is_active", "created_at"]
+# Everything UserResponse needs, and never the password hash
+USER_PROJECTION = {field: 1 for field in USER_FIELDS}
+
+def _user_response(document: dict) -> dict:
+    """UserResponse-shaped dict built from a raw (projected) user document"""
+    response = {"id": str(document["_id"])}
+    for field in USER_FIELDS:
+        response[field] = document.get(field)
+    return response
 
 @router.get("/me", response_model=models.UserResponse)
 async def read_users_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+    return models.UserResponse(
+        id=str(current_user.id),
+        email=current_user.email,
+        username=current_user.username,
+        is_active=current_user.is_active,
+        created_at=current_user.created_at
+    )
 
 @router.get("/", response_model=List[models.UserResponse])
-async def read_users(skip: int = 0, limit: int = 100):
+async def read_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    query = {}
+    if cursor:
+        query = keyset_filter("created_at", ASCENDING, *decode_cursor(cursor))
+        skip = 0
     try:
-        users = await models.User.find().skip(skip).limit(limit).to_list()
-        return users
-    except Exception as e:
-        print(f"Read users error: {str(e)}")
+        with timed("db_query"):
+            users = await models.User.get_motor_collection().find(
+                query, USER_PROJECTION
+            ).sort(sort_spec("created_at", ASCENDING)).skip(skip).limit(limit + 1).to_list(None)
+            total = await models.User.get_motor_collection().estimated_document_count()
+        next_cursor = page_cursor(users, limit, "created_at")
+        response.headers["X-Total-Count"] = str(total)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        # Rendered as-is: the projection already matches UserResponse
+        return ORJSONResponse([_user_response(user) for user in users], headers=dict(response.headers))
+    except Exception:
+        logger.exception("Read users error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while fetching users"
@@ -24,12 +67,17 @@ async def read_users(skip: int = 0, limit: int = 100):
 @router.get("/{user_id}", response_model=models.UserResponse)
 async def read_user(user_id: str):
     try:
-        user = await models.User.get(user_id)
+        with timed("db_query"):
+            user = await models.User.get_motor_collection().find_one(
+                {"_id": ObjectId(user_id)}, USER_PROJECTION
+            ) if ObjectId.is_valid(user_id) else None
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except Exception as e:
-        print(f"Read user error: {str(e)}")
+        return _user_response(user)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Read user error")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while fetching the user"
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from .models import RefreshSession
+import hashlib
+import os
+import secrets
+
+load_dotenv()
+
+# --- Refresh sessions ---
+#
+# Login hands out an opaque refresh token next to the short-lived access
+# token. Only its SHA-256 is stored, as the _id of a RefreshSession, so
+# renewing an access token is a single point lookup on _id instead of a
+# bcrypt check. Each refresh consumes the session and opens a new one
+# (rotation), which keeps the expiry sliding for active clients.
+
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+def _session_id(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+async def create_session(user_id: str) -> str:
+    """Open a session for ``user_id`` and return its refresh token"""
+    refresh_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    await RefreshSession.get_motor_collection().insert_one({
+        "_id": _session_id(refresh_token),
+        "user_id": user_id,
+        "created_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    })
+    return refresh_token
+
+
+async def consume_session(refresh_token: str) -> Optional[dict]:
+    """
+    Atomically remove the session of a refresh token and return it, or None
+    if the token is unknown, revoked, expired or was already used.
+    """
+    return await RefreshSession.get_motor_collection().find_one_and_delete({
+        "_id": _session_id(refresh_token),
+        # The TTL monitor only runs once a minute
+        "expires_at": {"$gt": datetime.utcnow()},
+    })
+
+
+async def revoke_session(refresh_token: str) -> bool:
+    result = await RefreshSession.get_motor_collection().delete_one({"_id": _session_id(refresh_token)})
+    return result.deleted_count > 0
+
+
+async def revoke_user_sessions(user_id: str) -> int:
+    """Revoke every refresh token of a user, e.g. after a password change"""
+    result = await RefreshSession.get_motor_collection().delete_many({"user_id": user_id})
+    return result.deleted_count
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from jose import JWTError, jwt
+from dotenv import load_dotenv
+from .cache import TTLCache
+from .metrics import registry, Counter
+import hashlib
+import os
+import time
+
+load_dotenv()
+
+# --- Signing keys ---
+#
+# New tokens are signed with SECRET_KEY and carry its id (JWT_KEY_ID) in the
+# ``kid`` header. Keys listed in JWT_RETIRED_KEYS ("kid:secret,kid:secret")
+# are still accepted for verification, so a key can be rotated by moving the
+# current one there and setting a new SECRET_KEY/JWT_KEY_ID; tokens signed
+# with the old key stay valid until they expire. Tokens without a ``kid``
+# (issued before key ids existed) are checked against the signing key.
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    raise ValueError("SECRET_KEY must be set in environment variables")
+ALGORITHM = "HS256"
+JWT_KEY_ID = os.getenv("JWT_KEY_ID", "default")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+
+def _parse_keys(value: str) -> Dict[str, str]:
+    keys = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kid, sep, secret = entry.partition(":")
+        if not sep or not kid or not secret:
+            raise ValueError("JWT_RETIRED_KEYS entries must look like kid:secret")
+        keys[kid] = secret
+    return keys
+
+
+VERIFICATION_KEYS = _parse_keys(os.getenv("JWT_RETIRED_KEYS", ""))
+VERIFICATION_KEYS[JWT_KEY_ID] = SECRET_KEY
+
+# Claims of verified tokens keyed by the SHA-256 of the token. Each entry
+# lives until its token expires, so a hit never outlives the ``exp`` claim.
+verified_tokens = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=0)
+
+token_verifications_total = registry.register(Counter(
+    "token_verifications_total", "Access tokens checked, by outcome", ("result",)
+))
+
+
+def create_token(claims: dict, expires_delta: timedelta) -> str:
+    """Sign ``claims`` with the current key, expiring after ``expires_delta``"""
+    to_encode = claims.copy()
+    to_encode["exp"] = datetime.utcnow() + expires_delta
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM, headers={"kid": JWT_KEY_ID})
+
+
+def _verify(token: str) -> dict:
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = VERIFICATION_KEYS.get(kid) if kid is not None else SECRET_KEY
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+def decode_token(token: str) -> dict:
+    """
+    Claims of a valid token, served from ``verified_tokens`` when this
+    process has verified the token before. Raises JWTError otherwise.
+    The returned dict is shared with the cache and must not be modified.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims: Optional[dict] = verified_tokens.get(digest)
+    if claims is not None:
+        token_verifications_total.inc("cache_hit")
+        return claims
+    try:
+        claims = _verify(token)
+    except JWTError:
+        token_verifications_total.inc("rejected")
+        raise
+    token_verifications_total.inc("verified")
+    remaining = claims.get("exp", 0) - time.time()
+    if remaining > 0:
+        verified_tokens.set(digest, claims, ttl=remaining)
+    return claims
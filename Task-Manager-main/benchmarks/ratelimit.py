@@ -0,0 +1,143 @@
+"""
+CPU cost of a password-guessing attack on POST /api/auth/token.
+
+Sends wrong-password logins at a fixed rate from a few client addresses
+against a handful of existing accounts (so every unthrottled attempt costs a
+bcrypt verify), while another user logs in from its own address once a
+second. Runs the attack three times:
+
+- without protection
+- with the login rate limits (LOGIN_RATE_LIMIT_IP / LOGIN_RATE_LIMIT_ACCOUNT
+  as configured, 20/minute and 10/minute by default)
+- with the rate limits and the hashing queue capped at ``--max-waiting``
+  (PASSWORD_HASH_MAX_WAITING)
+
+and reports how many bcrypt verifies ran, the CPU time the process used and
+how the legitimate logins fared.
+
+    python -m benchmarks.ratelimit --rate 20 --duration 10 --ips 4
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from app import database
+from app.hashing import hashing_pool
+from app.main import app
+from app.ratelimit import rate_limiter, LOGIN_RATE_LIMIT_IP, LOGIN_RATE_LIMIT_ACCOUNT
+from app.routers import auth
+
+PASSWORD = "benchmark-password"
+
+
+def client_from(address: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(address, 50000))
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=600)
+
+
+async def attack(args, limits_on: bool, max_waiting) -> dict:
+    auth.LOGIN_RATE_LIMIT_IP = LOGIN_RATE_LIMIT_IP if limits_on else None
+    auth.LOGIN_RATE_LIMIT_ACCOUNT = LOGIN_RATE_LIMIT_ACCOUNT if limits_on else None
+    hashing_pool.max_waiting = max_waiting
+    rate_limiter.memory._buckets.clear()
+
+    attackers = [client_from(f"203.0.113.{i + 1}") for i in range(args.ips)]
+    user = client_from("198.51.100.7")
+    targets = [f"target{i}" for i in range(args.accounts)]
+    statuses: Dict[int, int] = {}
+    legit_ms: List[float] = []
+    legit_ok = 0
+
+    async def attempt(n: int):
+        client = attackers[n % len(attackers)]
+        response = await client.post("/api/auth/token", data={
+            "username": targets[n % len(targets)], "password": f"wrong-{n}"
+        })
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def legitimate():
+        nonlocal legit_ok
+        start = time.perf_counter()
+        response = await user.post("/api/auth/token", data={"username": "member", "password": PASSWORD})
+        legit_ms.append((time.perf_counter() - start) * 1000)
+        legit_ok += response.status_code == 200
+
+    verifies_before = hashing_pool.completed + hashing_pool.failed
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    pending = []
+    total = int(args.rate * args.duration)
+    for n in range(total):
+        pending.append(asyncio.create_task(attempt(n)))
+        if n % args.rate == 0:
+            pending.append(asyncio.create_task(legitimate()))
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+
+    for client in attackers + [user]:
+        await client.aclose()
+    return {
+        "attempts": total,
+        "statuses": statuses,
+        "bcrypt_verifies": hashing_pool.completed + hashing_pool.failed - verifies_before,
+        "cpu_s": time.process_time() - cpu_before,
+        "wall_s": elapsed,
+        "legit_ok": legit_ok,
+        "legit_total": len(legit_ms),
+        "legit_p50_ms": statistics.median(legit_ms),
+        "legit_max_ms": max(legit_ms),
+    }
+
+
+async def main(args) -> int:
+    database.client = AsyncMongoMockClient()
+    await init_beanie(database=database.client[database.DB_NAME], document_models=database.DOCUMENT_MODELS)
+    async with client_from("192.0.2.1") as setup:
+        for username in ["member"] + [f"target{i}" for i in range(args.accounts)]:
+            response = await setup.post("/api/auth/signup", json={
+                "email": f"{username}@example.com", "username": username, "password": PASSWORD
+            })
+            response.raise_for_status()
+
+    print(f"{args.rate} attempts/s for {args.duration}s from {args.ips} addresses "
+          f"against {args.accounts} accounts; hashing workers: {hashing_pool.workers}\n")
+    print(f"{'protection':<22}{'401':>6}{'429':>6}{'503':>6}{'bcrypt':>8}{'cpu s':>8}{'wall s':>8}"
+          f"{'legit ok':>10}{'legit p50 ms':>14}{'legit max ms':>14}")
+    for name, limits_on, max_waiting in [
+        ("none", False, None),
+        ("rate limits", True, None),
+        (f"+ max waiting {args.max_waiting}", True, args.max_waiting),
+    ]:
+        r = await attack(args, limits_on, max_waiting)
+        s = r["statuses"]
+        print(f"{name:<22}{s.get(401, 0):>6}{s.get(429, 0):>6}{s.get(503, 0):>6}"
+              f"{r['bcrypt_verifies']:>8}{r['cpu_s']:>8.1f}{r['wall_s']:>8.1f}"
+              f"{r['legit_ok']:>5}/{r['legit_total']:<4}{r['legit_p50_ms']:>14.0f}{r['legit_max_ms']:>14.0f}")
+    hashing_pool.shutdown()
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Login brute-force CPU benchmark")
+    parser.add_argument("--rate", type=int, default=20, help="Attack attempts per second")
+    parser.add_argument("--duration", type=int, default=10, help="Seconds of attack traffic")
+    parser.add_argument("--ips", type=int, default=4, help="Attacking client addresses")
+    parser.add_argument("--accounts", type=int, default=4, help="Existing accounts targeted")
+    parser.add_argument("--max-waiting", type=int, default=4, help="Hashing queue cap for the last run")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
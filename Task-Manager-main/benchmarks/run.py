@@ -0,0 +1,334 @@
+"""
+Load-testing harness for the task API.
+
+Seeds N users x M tasks, drives a weighted mix of login/refresh/list/create/
+update/delete/stats requests at one or more concurrency levels, and reports RPS and
+p50/p95/p99 latency per operation. Results are written as JSON and can be
+compared against a stored baseline; any regression beyond the tolerance makes
+the run exit non-zero.
+
+Run from the project root:
+
+    pip install -r requirements.txt -r benchmarks/requirements.txt
+
+    # In-process against mongomock-motor (no server needed)
+    python -m benchmarks.run --users 5 --tasks 200 --concurrency 1,8,32
+
+    # In-process against a real MongoDB (uses MONGODB_URL / DB_NAME)
+    python -m benchmarks.run --backend mongodb
+
+    # Over HTTP against a running server (uvicorn/gunicorn)
+    python -m benchmarks.run --url http://localhost:8000
+
+    # Record a baseline, then fail on regressions against it
+    python -m benchmarks.run --output benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.15
+
+    # Password logins against refresh-token renewals
+    python -m benchmarks.run --mix login=50,refresh=50
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Every in-process request comes from one address; measure throughput, not the limiter
+os.environ.setdefault("LOGIN_RATE_LIMIT_IP", "off")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ACCOUNT", "off")
+
+import httpx
+
+DEFAULT_MIX = "list=40,stats=15,create=15,update=15,delete=10,login=5"
+PASSWORD = "benchmark-password"
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+# --- Target setup ---
+
+async def inprocess_client(backend: str) -> httpx.AsyncClient:
+    """ASGI client for app.main:app with the database initialised directly"""
+    from beanie import init_beanie
+    from app import database
+    from app.main import app
+    from app.models import User, Task, TaskVersion, RefreshSession
+
+    if backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        database.client = AsyncMongoMockClient()
+        await init_beanie(database=database.client[database.DB_NAME], document_models=[User, Task, TaskVersion, RefreshSession])
+    else:
+        await database.init_db()
+
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60)
+
+
+# --- Seeding ---
+
+class Session:
+    def __init__(self, identifier: str, headers: dict):
+        self.identifier = identifier
+        self.headers = headers
+        self.task_ids: List[str] = []
+        # Unused refresh tokens; each is taken by one request at a time
+        self.refresh_tokens: List[str] = []
+
+
+async def seed(client: httpx.AsyncClient, users: int, tasks: int) -> List[Session]:
+    sessions = []
+    run_id = uuid.uuid4().hex[:8]
+    for i in range(users):
+        username = f"bench_{run_id}_{i}"
+        email = f"{username}@example.com"
+        response = await client.post("/api/auth/signup", json={
+            "email": email, "username": username, "password": PASSWORD
+        })
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        session = Session(email, headers)
+        session.refresh_tokens.append(response.json()["refresh_token"])
+
+        for start in range(0, tasks, 1000):
+            operations = [
+                {"op": "create", "task": {
+                    "title": f"Seed task {n}",
+                    "description": "Seeded by the benchmark harness",
+                    "priority": random.choice(["low", "medium", "high"]),
+                }}
+                for n in range(start, min(start + 1000, tasks))
+            ]
+            response = await client.post(
+                "/api/tasks/bulk", json={"operations": operations, "ordered": False}, headers=headers
+            )
+            response.raise_for_status()
+            session.task_ids.extend(r["id"] for r in response.json()["results"] if r["status"] == "created")
+        sessions.append(session)
+    return sessions
+
+
+# --- Operations ---
+
+async def op_login(client, session):
+    response = await client.post("/api/auth/token", data={"username": session.identifier, "password": PASSWORD})
+    if response.status_code == 200:
+        session.refresh_tokens.append(response.json()["refresh_token"])
+    return response
+
+async def op_refresh(client, session):
+    if not session.refresh_tokens:
+        return await op_login(client, session)
+    refresh_token = session.refresh_tokens.pop()
+    response = await client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    if response.status_code == 200:
+        session.refresh_tokens.append(response.json()["refresh_token"])
+    return response
+
+async def op_list(client, session):
+    return await client.get("/api/tasks/", params={"limit": 50}, headers=session.headers)
+
+async def op_stats(client, session):
+    return await client.get("/api/tasks/stats", headers=session.headers)
+
+async def op_create(client, session):
+    response = await client.post("/api/tasks/", json={
+        "title": "Benchmark task", "description": "created under load", "priority": "medium"
+    }, headers=session.headers)
+    if response.status_code == 200:
+        body = response.json()
+        session.task_ids.append(body["id"])
+    return response
+
+async def op_update(client, session):
+    if not session.task_ids:
+        return await op_create(client, session)
+    task_id = random.choice(session.task_ids)
+    return await client.put(f"/api/tasks/{task_id}", json={"completed": True}, headers=session.headers)
+
+async def op_delete(client, session):
+    if not session.task_ids:
+        return await op_create(client, session)
+    task_id = session.task_ids.pop(random.randrange(len(session.task_ids)))
+    return await client.delete(f"/api/tasks/{task_id}", headers=session.headers)
+
+OPERATIONS = {
+    "login": op_login,
+    "refresh": op_refresh,
+    "list": op_list,
+    "stats": op_stats,
+    "create": op_create,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+# --- Load generation ---
+
+async def run_level(client, sessions, mix, concurrency: int, duration: float) -> dict:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = {n: 0 for n in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            session = random.choice(sessions)
+            start = time.perf_counter()
+            try:
+                response = await OPERATIONS[name](client, session)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in names:
+        values = sorted(latencies[name])
+        results[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+    total = sum(len(v) for v in latencies.values())
+    results["_total"] = {"requests": total, "rps": round(total / elapsed, 2), "seconds": round(elapsed, 3)}
+    return results
+
+
+def print_report(concurrency: int, results: dict) -> None:
+    print(f"\nconcurrency={concurrency}  total rps={results['_total']['rps']}")
+    print(f"{'operation':<10}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in results.items():
+        if name.startswith("_"):
+            continue
+        print(f"{name:<10}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions where p95 grew or RPS fell by more than ``tolerance``"""
+    regressions = []
+    for level, ops in results["levels"].items():
+        for name, row in ops.items():
+            base = baseline.get("levels", {}).get(level, {}).get(name)
+            if name.startswith("_") or not base or not base.get("requests"):
+                continue
+            if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"c={level} {name}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms"
+                )
+            if row["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"c={level} {name}: rps {base['rps']} -> {row['rps']}")
+    return regressions
+
+
+async def run_benchmark(args) -> dict:
+    """Seed, warm up and measure every concurrency level; returns the JSON result"""
+    random.seed(args.seed)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client = await inprocess_client(args.backend)
+
+    async with client:
+        print(f"Seeding {args.users} users x {args.tasks} tasks...")
+        sessions = await seed(client, args.users, args.tasks)
+        if args.warmup:
+            await run_level(client, sessions, args.mix, max(args.concurrency), args.warmup)
+
+        output = {
+            "meta": {
+                "target": args.url or f"in-process ({args.backend})",
+                "users": args.users,
+                "tasks": args.tasks,
+                "duration": args.duration,
+                "mix": args.mix,
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "levels": {},
+        }
+        for concurrency in args.concurrency:
+            results = await run_level(client, sessions, args.mix, concurrency, args.duration)
+            output["levels"][str(concurrency)] = results
+            print_report(concurrency, results)
+    return output
+
+
+async def main(args) -> int:
+    output = await run_benchmark(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(output, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS vs {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Task API load test")
+    parser.add_argument("--url", help="Benchmark a running server instead of app.main:app in-process")
+    parser.add_argument("--backend", choices=["mongomock", "mongodb"], default="mongomock",
+                        help="Database for in-process runs (mongodb uses MONGODB_URL)")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks seeded per user")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Warm-up seconds before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Weighted operation mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression in p95 latency or RPS")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,113 @@
+"""
+Measure how throughput scales with the number of gunicorn workers.
+
+For each worker count this starts ``gunicorn app.main:app -c gunicorn.conf.py``
+with WEB_CONCURRENCY set, waits for /health/ready, runs the load mix from
+``benchmarks.run`` over HTTP and stops the server. It needs a real MongoDB
+(MONGODB_URL / DB_NAME), since workers are separate processes.
+
+    python -m benchmarks.scaling --workers 1,2,4,8 --concurrency 64 --duration 20
+
+Prints total RPS and p95 per worker count and the speed-up over the first.
+"""
+from typing import List, Optional
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks import run
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), LOG_LEVEL="WARNING")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py"],
+        env=env,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def main(args) -> int:
+    url = f"http://127.0.0.1:{args.port}"
+    rows = []
+    for workers in args.workers:
+        process = start_server(workers, args.port)
+        try:
+            await wait_ready(url)
+            run_args = run.parse_args([
+                "--url", url,
+                "--users", str(args.users),
+                "--tasks", str(args.tasks),
+                "--concurrency", str(args.concurrency),
+                "--duration", str(args.duration),
+                "--warmup", str(args.warmup),
+                "--mix", args.mix,
+            ])
+            print(f"\n=== {workers} worker(s) ===")
+            output = await run.run_benchmark(run_args)
+        finally:
+            stop_server(process)
+
+        level = output["levels"][str(args.concurrency)]
+        p95 = max(row["p95_ms"] for name, row in level.items() if not name.startswith("_"))
+        rows.append({"workers": workers, "rps": level["_total"]["rps"], "worst_p95_ms": p95})
+
+    base = rows[0]["rps"] or 1
+    print(f"\n{'workers':>8}{'rps':>12}{'speed-up':>10}{'worst p95 ms':>14}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['rps']:>12}{row['rps'] / base:>10.2f}{row['worst_p95_ms']:>14}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "concurrency": args.concurrency, "results": rows}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)) | {1})
+    parser = argparse.ArgumentParser(description="Throughput vs. gunicorn worker count")
+    parser.add_argument("--workers", type=lambda v: [int(w) for w in v.split(",")],
+                        default=default_workers, help="Worker counts to try (default: 1,2,4,...,CPU count)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", default=run.DEFAULT_MIX)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,135 @@
+"""
+Serialization and compression cost of a task list response.
+
+Starts from N raw task documents as the driver returns them (1,000 by
+default) and compares, per response:
+
+- Beanie parse + response_model validation + jsonable_encoder + stdlib json
+  (FastAPI's default path)
+- Beanie parse + orjson rendering the documents
+- projected raw documents mapped to TaskResponse dicts + orjson (what
+  read_tasks does now)
+
+then reports the body size uncompressed, gzip and brotli (at the levels
+configured in app.compression) and the CPU time spent compressing.
+
+    python -m benchmarks.serialization --tasks 1000 --repeat 50
+"""
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+import argparse
+import asyncio
+import gzip
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from beanie import init_beanie
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from mongomock_motor import AsyncMongoMockClient
+
+from app.compression import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL, brotli
+from app.models import Priority, Task, TaskVersion, User
+from app.responses import ORJSONResponse
+from app.routers.tasks import _task_response
+
+
+def make_documents(count: int) -> List[dict]:
+    """Raw task documents shaped like the driver returns them"""
+    now = datetime.utcnow()
+    priorities = [priority.value for priority in Priority]
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Task number {i}",
+            "description": "Write the quarterly report and send it to the team for review",
+            "priority": priorities[i % 3],
+            "due_date": now + timedelta(days=i % 30) if i % 4 else None,
+            "completed": bool(i % 5 == 0),
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+            "owner_id": "507f1f77bcf86cd799439011",
+        }
+        for i in range(count)
+    ]
+
+
+def timed_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args) -> int:
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client["benchmark"], document_models=[User, Task, TaskVersion])
+    documents = make_documents(args.tasks)
+    field = create_response_field(name="Response_read_tasks", type_=List[Task])
+
+    async def default_path():
+        tasks = [Task.parse_obj(document) for document in documents]
+        return JSONResponse(await serialize_response(field=field, response_content=tasks))
+
+    loop_samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await default_path()
+        loop_samples.append((time.perf_counter() - start) * 1000)
+    default_ms = statistics.median(loop_samples)
+    default_body = (await default_path()).body
+
+    def documents_path():
+        return ORJSONResponse([Task.parse_obj(document) for document in documents])
+
+    def raw_path():
+        return ORJSONResponse([_task_response(document) for document in documents])
+
+    documents_ms = timed_ms(documents_path, args.repeat)
+    raw_ms = timed_ms(raw_path, args.repeat)
+    body = raw_path().body
+
+    per_task = 1000 / args.tasks  # ms per response -> us per task
+    print(f"{args.tasks} tasks, median of {args.repeat} runs\n")
+    print(f"{'path':<44}{'ms':>10}{'us/task':>10}{'bytes':>12}")
+    for name, ms, size in [
+        ("Beanie + response_model + jsonable_encoder", default_ms, len(default_body)),
+        ("Beanie documents + orjson", documents_ms, len(documents_path().body)),
+        ("raw projected dicts + orjson", raw_ms, len(body)),
+    ]:
+        print(f"{name:<44}{ms:>10.2f}{ms * per_task:>10.1f}{size:>12}")
+    print(f"speed-up over the default path: {default_ms / raw_ms:.1f}x\n")
+
+    print(f"{'encoding':<44}{'ms':>10}{'bytes':>12}{'ratio':>8}")
+    rows = [("identity", 0.0, len(body))]
+    gzip_ms = timed_ms(lambda: gzip.compress(body, COMPRESSION_GZIP_LEVEL), args.repeat)
+    rows.append((f"gzip (level {COMPRESSION_GZIP_LEVEL})", gzip_ms, len(gzip.compress(body, COMPRESSION_GZIP_LEVEL))))
+    if brotli is not None:
+        br_ms = timed_ms(lambda: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY), args.repeat)
+        rows.append((f"brotli (quality {COMPRESSION_BROTLI_QUALITY})", br_ms,
+                     len(brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY))))
+    else:
+        print("(brotli not installed; skipping)")
+    for name, ms, size in rows:
+        print(f"{name:<44}{ms:>10.2f}{size:>12}{len(body) / size:>8.1f}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Task list serialization benchmark")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,77 @@
+"""
+Per-request cost of checking an access token.
+
+Compares python-jose's ``jwt.decode`` on every request (what
+get_current_user did before) with ``app.tokens.decode_token``, both on a
+cache miss (the first request with a token) and on a hit (every later
+one), and reports the cost of signing a token at login.
+
+    python -m benchmarks.tokens --tokens 1000 --repeat 20
+"""
+from datetime import timedelta
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from jose import jwt
+
+from app.tokens import ALGORITHM, SECRET_KEY, create_token, decode_token, verified_tokens
+
+
+def per_call_us(fn, tokens, repeat: int) -> float:
+    """Median microseconds per call of ``fn`` over every token"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for token in tokens:
+            fn(token)
+        samples.append((time.perf_counter() - start) / len(tokens) * 1e6)
+    return statistics.median(samples)
+
+
+def main(args) -> int:
+    expires = timedelta(minutes=30)
+    subjects = [f"user{i}@example.com" for i in range(args.tokens)]
+
+    sign_us = per_call_us(lambda sub: create_token({"sub": sub}, expires), subjects, args.repeat)
+    tokens = [create_token({"sub": sub}, expires) for sub in subjects]
+
+    jose_us = per_call_us(lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]), tokens, args.repeat)
+
+    def cold(token):
+        verified_tokens.clear()
+        decode_token(token)
+
+    miss_us = per_call_us(cold, tokens, args.repeat)
+    verified_tokens.clear()
+    for token in tokens:
+        decode_token(token)
+    hit_us = per_call_us(decode_token, tokens, args.repeat)
+
+    print(f"{args.tokens} tokens, median of {args.repeat} runs\n")
+    print(f"{'operation':<40}{'us/call':>10}")
+    for name, us in [
+        ("create_token (login)", sign_us),
+        ("jose jwt.decode (every request)", jose_us),
+        ("decode_token, cache miss", miss_us),
+        ("decode_token, cache hit", hit_us),
+    ]:
+        print(f"{name:<40}{us:>10.2f}")
+    print(f"speed-up on repeat requests: {jose_us / hit_us:.0f}x")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Access token verification benchmark")
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
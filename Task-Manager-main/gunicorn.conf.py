@@ -0,0 +1,29 @@
+# Gunicorn settings for running the API on every core:
+#
+#     gunicorn app.main:app -c gunicorn.conf.py
+#
+# Each worker is a separate uvicorn process that imports the app and runs its
+# lifespan on its own, so every worker opens its own MongoDB client, hashing
+# pool and heartbeat. Keep preload_app off: a client created in the master
+# would be shared across fork(), which pymongo does not support.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = False
+
+# On SIGTERM workers stop accepting connections and get this long to finish
+# in-flight requests before they are killed
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers periodically to bound memory growth (0 disables)
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+
+accesslog = None  # requests are logged by RequestContextMiddleware
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
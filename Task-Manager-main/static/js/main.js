@@ -1,5 +1,6 @@
 // Global state
 let token = localStorage.getItem('token');
+let refreshToken = localStorage.getItem('refreshToken');
 let tasks = [];
 
 // DOM Elements
@@ -22,15 +23,58 @@ function isTokenExpired(token) {
     }
 }
 
+// Store the tokens returned by login, signup and refresh
+function storeTokens(data) {
+    token = data.access_token;
+    localStorage.setItem('token', token);
+    if (data.refresh_token) {
+        refreshToken = data.refresh_token;
+        localStorage.setItem('refreshToken', refreshToken);
+    }
+    if (data.user) {
+        localStorage.setItem('user', JSON.stringify(data.user));
+    }
+}
+
+// Renew an expired access token with the refresh token instead of asking
+// for the password again. Concurrent callers share one request, since a
+// refresh token can only be used once.
+let refreshInFlight = null;
+
+async function ensureFreshToken() {
+    if (token && !isTokenExpired(token)) return true;
+    if (!refreshToken) return false;
+    if (!refreshInFlight) {
+        refreshInFlight = (async () => {
+            try {
+                const response = await fetch('/api/auth/refresh', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ refresh_token: refreshToken }),
+                });
+                if (!response.ok) return false;
+                storeTokens(await response.json());
+                return true;
+            } catch (e) {
+                return false;
+            } finally {
+                refreshInFlight = null;
+            }
+        })();
+    }
+    return refreshInFlight;
+}
+
 // Check authentication status on load
-document.addEventListener('DOMContentLoaded', () => {
-    if (token && !isTokenExpired(token)) {
+document.addEventListener('DOMContentLoaded', async () => {
+    if (await ensureFreshToken()) {
         showDashboard();
         loadTasks();
+        connectTaskStream();
         updateNavigation();
     } else {
-        if (token) {
-            logout(); // Auto logout if token is expired
+        if (token || refreshToken) {
+            logout(); // Auto logout if the session has expired
         } else {
             showLoginForm();
         }
@@ -111,9 +155,8 @@ loginForm.addEventListener('submit', async (e) => {
         const data = await response.json();
         
         if (data.access_token) {
-            // Store the token
-            token = data.access_token;
-            localStorage.setItem('token', token);
+            // Store the tokens
+            storeTokens(data);
             
             // Show success message
             showToast('Login successful!', 'success');
@@ -121,6 +164,7 @@ loginForm.addEventListener('submit', async (e) => {
             // Show dashboard and load data
             showDashboard();
             loadTasks();
+            connectTaskStream();
             updateNavigation();
         } else {
             showToast('Login failed. Please try again.', 'error');
@@ -177,15 +221,12 @@ document.getElementById('signupForm').addEventListener('submit', async (e) => {
 
         // Store token and user data
         if (data.access_token) {
-            token = data.access_token;
-            localStorage.setItem('token', data.access_token);
-            if (data.user) {
-                localStorage.setItem('user', JSON.stringify(data.user));
-            }
-            
+            storeTokens(data);
+
             showToast('Signup successful!', 'success');
             showDashboard();
             loadTasks();
+            connectTaskStream();
             updateNavigation();
         } else {
             showToast('Signup succeeded but no token received', 'error');
@@ -201,7 +242,7 @@ document.getElementById('signupForm').addEventListener('submit', async (e) => {
 
 // Task Management
 async function loadTasks() {
-    if (!token || isTokenExpired(token)) {
+    if (!(await ensureFreshToken())) {
         logout();
         return;
     }
@@ -249,12 +290,12 @@ function createTaskElement(task) {
                 </div>
             </div>
             <div class="flex space-x-2">
-                <button onclick="editTask(${task.id})" class="text-blue-600 hover:text-blue-800">
+                <button onclick="editTask('${task.id}')" class="text-blue-600 hover:text-blue-800">
                     <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                         <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"/>
                     </svg>
                 </button>
-                <button onclick="deleteTask(${task.id})" class="text-red-600 hover:text-red-800">
+                <button onclick="deleteTask('${task.id}')" class="text-red-600 hover:text-red-800">
                     <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                         <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"/>
                     </svg>
@@ -289,6 +330,7 @@ document.querySelector('#newTaskForm form').addEventListener('submit', async (e)
     };
 
     try {
+        await ensureFreshToken();
         const response = await fetch('/api/tasks/', {
             method: 'POST',
             headers: {
@@ -300,7 +342,7 @@ document.querySelector('#newTaskForm form').addEventListener('submit', async (e)
 
         if (response.ok) {
             hideNewTaskForm();
-            loadTasks();
+            applyTaskEvent({ type: 'created', task: await response.json() });
             showToast('Task created successfully!', 'success');
             e.target.reset();
         } else {
@@ -314,15 +356,31 @@ document.querySelector('#newTaskForm form').addEventListener('submit', async (e)
 });
 
 // Task Statistics
-function updateTaskStats() {
-    const ctx = document.getElementById('taskStats').getContext('2d');
-    const priorityCounts = {
-        high: tasks.filter(t => t.priority === 'high').length,
-        medium: tasks.filter(t => t.priority === 'medium').length,
-        low: tasks.filter(t => t.priority === 'low').length,
-    };
+let taskStatsChart = null;
+
+async function updateTaskStats() {
+    let stats;
+    try {
+        await ensureFreshToken();
+        const response = await fetch('/api/tasks/stats', {
+            headers: {
+                'Authorization': `Bearer ${token}`,
+            },
+        });
+        if (!response.ok) return;
+        stats = await response.json();
+    } catch (error) {
+        console.error('Task stats error:', error);
+        return;
+    }
+
+    const priorityCounts = stats.by_priority;
+    if (taskStatsChart) {
+        taskStatsChart.destroy();
+    }
 
-    new Chart(ctx, {
+    const ctx = document.getElementById('taskStats').getContext('2d');
+    taskStatsChart = new Chart(ctx, {
         type: 'doughnut',
         data: {
             labels: ['High', 'Medium', 'Low'],
@@ -342,6 +400,113 @@ function updateTaskStats() {
     });
 }
 
+// Live Updates
+// /api/tasks/stream is read with fetch() rather than EventSource so the
+// token can be sent in the Authorization header.
+let taskStreamController = null;
+let taskStreamRetryDelay = 1000;
+let statsRefreshTimer = null;
+
+async function connectTaskStream(isReconnect = false) {
+    if (!(await ensureFreshToken())) return;
+    disconnectTaskStream();
+    const controller = new AbortController();
+    taskStreamController = controller;
+
+    try {
+        const response = await fetch('/api/tasks/stream', {
+            headers: {
+                'Authorization': `Bearer ${token}`,
+            },
+            signal: controller.signal,
+        });
+        if (response.status === 401) {
+            logout();
+            return;
+        }
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+        taskStreamRetryDelay = 1000;
+        if (isReconnect) loadTasks(); // changes may have been missed while disconnected
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            messages.forEach(handleTaskStreamMessage);
+        }
+    } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error('Task stream error:', error);
+    }
+
+    // Stream ended or failed: reconnect with backoff
+    if (taskStreamController === controller) {
+        taskStreamController = null;
+        setTimeout(() => connectTaskStream(true), taskStreamRetryDelay);
+        taskStreamRetryDelay = Math.min(taskStreamRetryDelay * 2, 30000);
+    }
+}
+
+function disconnectTaskStream() {
+    if (taskStreamController) {
+        const controller = taskStreamController;
+        taskStreamController = null;
+        controller.abort();
+    }
+}
+
+function handleTaskStreamMessage(message) {
+    const data = message
+        .split('\n')
+        .filter(line => line.startsWith('data:'))
+        .map(line => line.slice(5).trim())
+        .join('\n');
+    if (!data) return; // comment / keepalive
+    try {
+        applyTaskEvent(JSON.parse(data));
+    } catch (error) {
+        console.error('Task event error:', error);
+    }
+}
+
+// Patch the local task list instead of reloading it
+function applyTaskEvent(event) {
+    switch (event.type) {
+        case 'created':
+        case 'updated': {
+            const task = event.task;
+            const index = tasks.findIndex(t => t.id === task.id);
+            if (index === -1) {
+                tasks.push(task);
+            } else {
+                tasks[index] = task;
+            }
+            break;
+        }
+        case 'deleted':
+            tasks = tasks.filter(t => t.id !== event.id);
+            break;
+        case 'resync':
+            loadTasks();
+            return;
+        default:
+            return;
+    }
+    renderTasks();
+    scheduleStatsRefresh();
+}
+
+// Coalesce bursts of events into one stats request
+function scheduleStatsRefresh() {
+    clearTimeout(statsRefreshTimer);
+    statsRefreshTimer = setTimeout(updateTaskStats, 500);
+}
+
 // Toast Notifications
 function showToast(message, type = 'success') {
     const toast = document.createElement('div');
@@ -376,9 +541,19 @@ function updateNavigation() {
 
 // Logout
 function logout() {
-    // Clear stored data
+    // Revoke the refresh token and clear stored data
+    disconnectTaskStream();
+    if (refreshToken) {
+        fetch('/api/auth/logout', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+        }).catch(() => {});
+    }
     token = null;
+    refreshToken = null;
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     
     // Show login form
@@ -396,6 +571,7 @@ async function deleteTask(taskId) {
     if (!confirm('Are you sure you want to delete this task?')) return;
 
     try {
+        await ensureFreshToken();
         const response = await fetch(`/api/tasks/${taskId}`, {
             method: 'DELETE',
             headers: {
@@ -404,7 +580,7 @@ async function deleteTask(taskId) {
         });
 
         if (response.ok) {
-            loadTasks();
+            applyTaskEvent({ type: 'deleted', id: taskId });
             showToast('Task deleted successfully', 'success');
         } else {
             const error = await response.json();
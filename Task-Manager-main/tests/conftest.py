@@ -0,0 +1,52 @@
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("PASSWORD_HASH_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("LOGIN_RATE_LIMIT_IP", "off")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ACCOUNT", "off")
+
+import httpx
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from app import database
+from app.cache import user_cache, task_stats_cache, task_count_cache
+from app.main import app
+from app.tokens import verified_tokens
+
+PASSWORD = "test-password"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """API client backed by an in-memory mongomock database"""
+    for cache in (user_cache, task_stats_cache, task_count_cache, verified_tokens):
+        cache.clear()
+    database.client = AsyncMongoMockClient()
+    await init_beanie(database=database.client[database.DB_NAME], document_models=database.DOCUMENT_MODELS)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def signup_and_login(client: httpx.AsyncClient, username: str = "alice") -> dict:
+    """Authorization header for a freshly created user"""
+    response = await client.post("/api/auth/signup", json={
+        "email": f"{username}@example.com", "username": username, "password": PASSWORD
+    })
+    assert response.status_code == 201, response.text
+    response = await client.post("/api/auth/token", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+async def auth_headers(client):
+    return await signup_and_login(client)
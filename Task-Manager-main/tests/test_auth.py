@@ -0,0 +1,25 @@
+import pytest
+
+from app.hashing import hashing_pool
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_duplicate_signup_is_rejected_before_hashing(client, auth_headers):
+    # Same case only: mongomock ignores the case-insensitive collation
+    hashes_before = hashing_pool.completed
+    for body, detail in [
+        ({"email": "alice@example.com", "username": "someone"}, "Email already registered"),
+        ({"email": "someone@example.com", "username": "alice"}, "Username already taken"),
+    ]:
+        response = await client.post("/api/auth/signup", json={**body, "password": PASSWORD})
+        assert response.status_code == 400
+        assert response.json()["detail"] == detail
+    assert hashing_pool.completed == hashes_before
+
+
+async def test_login_by_email_or_username(client, auth_headers):
+    for name in ("alice", "alice@example.com"):
+        response = await client.post("/api/auth/token", data={"username": name, "password": PASSWORD})
+        assert response.status_code == 200, response.text
@@ -0,0 +1,10 @@
+import pytest
+
+from app import database
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_init_db_rejects_zero_retries():
+    with pytest.raises(ValueError):
+        await database.init_db(retries=0)
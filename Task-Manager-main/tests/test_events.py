@@ -0,0 +1,48 @@
+import pytest
+
+from app.events import TaskEventBroker
+
+
+def test_delete_without_pre_image_is_not_sent_to_other_users():
+    broker = TaskEventBroker()
+    broker.mode = "change_stream"
+    owner, other = broker.subscribe("owner"), broker.subscribe("other")
+
+    broker._handle_change({"operationType": "delete", "documentKey": {"_id": "t1"}})
+    assert owner.empty() and other.empty()
+
+    # The worker that deleted the task still tells its owner
+    broker.publish("owner", "deleted", id="t1")
+    assert owner.get_nowait() == {"type": "deleted", "id": "t1"}
+    assert other.empty()
+
+
+def test_delete_with_pre_image_goes_to_owner():
+    broker = TaskEventBroker()
+    broker.mode = "change_stream"
+    broker.pre_images = True
+    owner, other = broker.subscribe("owner"), broker.subscribe("other")
+
+    broker.publish("owner", "deleted", id="t1")
+    broker._handle_change({
+        "operationType": "delete", "documentKey": {"_id": "t1"},
+        "fullDocumentBeforeChange": {"owner_id": "owner"},
+    })
+    assert owner.get_nowait() == {"type": "deleted", "id": "t1"}
+    assert owner.empty() and other.empty()
+
+
+@pytest.mark.parametrize("pre_images", [False, True])
+def test_resync_is_delivered_with_a_change_stream(pre_images):
+    broker = TaskEventBroker()
+    broker.mode = "change_stream"
+    broker.pre_images = pre_images
+    owner, other = broker.subscribe("owner"), broker.subscribe("other")
+
+    broker.publish("owner", "resync")
+    assert owner.get_nowait() == {"type": "resync"}
+    assert other.empty()
+
+    # Creates and updates still come only from the stream
+    broker.publish("owner", "created", task={"id": "t1"})
+    assert owner.empty()
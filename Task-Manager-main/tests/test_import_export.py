@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def import_body(client, headers, body: str, fmt: str) -> dict:
+    response = await client.post(f"/api/tasks/import?format={fmt}", content=body.encode(), headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def list_tasks(client, headers) -> list:
+    response = await client.get("/api/tasks/", headers=headers)
+    return response.json()
+
+
+async def test_ndjson_import_reports_bad_rows_by_line(client, auth_headers):
+    body = "\n".join([
+        json.dumps({"title": "First task", "priority": "high"}),
+        "",
+        "{not json",
+        json.dumps({"title": "x"}),
+        json.dumps({"title": "Second task", "description": "more"}),
+    ])
+    result = await import_body(client, auth_headers, body, "ndjson")
+
+    assert result["imported"] == 2
+    assert result["failed"] == 2
+    assert [e["line"] for e in result["errors"]] == [3, 4]
+    assert sorted(t["title"] for t in await list_tasks(client, auth_headers)) == ["First task", "Second task"]
+
+
+async def test_csv_import_keeps_quoted_newlines(client, auth_headers):
+    body = (
+        "title,description,priority\r\n"
+        'Multi line,"line1\r\nline2\r\n""quoted""",low\r\n'
+        "\r\n"
+        "No,too short,low\r\n"
+        "Single line,plain,high\r\n"
+    )
+    result = await import_body(client, auth_headers, body, "csv")
+
+    assert result["imported"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["line"] == 6
+    tasks = {t["title"]: t for t in await list_tasks(client, auth_headers)}
+    assert tasks["Multi line"]["description"] == 'line1\nline2\n"quoted"'
+    assert tasks["Single line"]["priority"] == "high"
+
+
+async def test_csv_import_reports_unterminated_quote(client, auth_headers):
+    body = 'title,description\nGood task,ok\nBroken task,"never closed\nmore\n'
+    result = await import_body(client, auth_headers, body, "csv")
+
+    assert result["imported"] == 1
+    assert result["errors"][0]["line"] == 3
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+async def test_export_import_round_trip(client, auth_headers, fmt):
+    response = await client.post("/api/tasks/", headers=auth_headers, json={
+        "title": "Round trip", "description": "line1\nline2, with comma", "priority": "low",
+        "due_date": "2030-01-01T00:00:00",
+    })
+    assert response.status_code == 200
+    original = response.json()
+    response = await client.put(f"/api/tasks/{original['id']}", headers=auth_headers, json={"completed": True})
+    original = response.json()
+
+    response = await client.get(f"/api/tasks/export?format={fmt}", headers=auth_headers)
+    assert response.status_code == 200
+    result = await import_body(client, auth_headers, response.text, fmt)
+
+    assert result == {"imported": 1, "failed": 0, "errors": []}
+    copies = [t for t in await list_tasks(client, auth_headers) if t["id"] != original["id"]]
+    assert len(copies) == 1
+    for field in ("title", "description", "priority", "due_date", "completed"):
+        assert copies[0][field] == original[field]
+
+
+async def test_csv_export(client, auth_headers):
+    for title, completed in (("Open task", False), ("Done task", True)):
+        response = await client.post("/api/tasks/", headers=auth_headers, json={"title": title})
+        if completed:
+            await client.put(f"/api/tasks/{response.json()['id']}", headers=auth_headers, json={"completed": True})
+
+    response = await client.get("/api/tasks/export?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="tasks.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(r["title"], r["completed"]) for r in rows] == [("Open task", "false"), ("Done task", "true")]
+    assert rows[0]["due_date"] == ""
+
+    response = await client.get("/api/tasks/export?format=csv&completed=true", headers=auth_headers)
+    assert [r["title"] for r in csv.DictReader(io.StringIO(response.text))] == ["Done task"]
+
+
+async def test_csv_import_reads_completed(client, auth_headers):
+    body = "title,completed\nFinished task,true\nPending task,false\nNo column task,\nBad flag,maybe\n"
+    result = await import_body(client, auth_headers, body, "csv")
+
+    assert result["imported"] == 3
+    assert result["errors"][0]["line"] == 5
+    tasks = {t["title"]: t["completed"] for t in await list_tasks(client, auth_headers)}
+    assert tasks == {"Finished task": True, "Pending task": False, "No column task": False}
@@ -0,0 +1,20 @@
+import json
+import logging
+import sys
+
+from app.log import JsonFormatter, StructuredQueueHandler
+
+
+def test_queued_exception_keeps_traceback_out_of_message():
+    logger = logging.getLogger("app.tests")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logger.makeRecord(
+            logger.name, logging.ERROR, __file__, 0, "Failed %s", ("task",), sys.exc_info()
+        )
+
+    queued = StructuredQueueHandler(None).prepare(record)
+    data = json.loads(JsonFormatter().format(queued))
+    assert data["message"] == "Failed task"
+    assert "ValueError: boom" in data["exc_info"]
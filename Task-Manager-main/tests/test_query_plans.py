@@ -0,0 +1,47 @@
+"""
+Query plan checks against a real MongoDB (mongomock cannot explain). Without
+MONGODB_TEST_URL they try localhost and are skipped when no server answers;
+with it set (as in CI) an unreachable server is a failure.
+"""
+import os
+
+import pytest
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app import database
+from app.explain import (
+    plan_stages, point_lookup_shapes, task_cursor_shapes, task_list_shapes, uses_index, winning_plan
+)
+
+pytestmark = pytest.mark.anyio
+
+REQUIRED = "MONGODB_TEST_URL" in os.environ
+MONGODB_TEST_URL = os.getenv("MONGODB_TEST_URL", "mongodb://localhost:27017")
+TEST_DB_NAME = "taskmaster_test_plans"
+
+
+@pytest.fixture
+async def mongodb():
+    client = AsyncIOMotorClient(MONGODB_TEST_URL, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        client.close()
+        if REQUIRED:
+            pytest.fail(f"no MongoDB at MONGODB_TEST_URL={MONGODB_TEST_URL}: {e}")
+        pytest.skip(f"no MongoDB at {MONGODB_TEST_URL}")
+    await client.drop_database(TEST_DB_NAME)
+    await init_beanie(database=client[TEST_DB_NAME], document_models=database.DOCUMENT_MODELS)
+    yield
+    await client.drop_database(TEST_DB_NAME)
+    client.close()
+
+
+async def test_every_query_shape_uses_an_index(mongodb):
+    scans = []
+    for name, explain in point_lookup_shapes() + task_list_shapes() + task_cursor_shapes():
+        plan = await explain()
+        if not uses_index(plan):
+            scans.append(f"{name}: {' > '.join(plan_stages(winning_plan(plan)))}")
+    assert not scans, "\n".join(scans)
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+
+from app.hashing import hashing_pool
+from app.main import app
+from app.models import User
+from app.ratelimit import Rate, rate_limiter
+from app.routers import auth
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Memory buckets only, emptied for each test; limits set per test"""
+    monkeypatch.setattr(rate_limiter, "shared", None)
+    rate_limiter.memory._buckets.clear()
+    yield monkeypatch
+    rate_limiter.memory._buckets.clear()
+
+
+@pytest.fixture
+def work_counter(monkeypatch):
+    """Counts user lookups and password verifies made by login"""
+    calls = {"lookups": 0, "verifies": 0}
+    find_one, verify = User.find_one, hashing_pool.verify_and_update
+
+    def counting_find_one(*args, **kwargs):
+        calls["lookups"] += 1
+        return find_one(*args, **kwargs)
+
+    async def counting_verify(*args, **kwargs):
+        calls["verifies"] += 1
+        return await verify(*args, **kwargs)
+
+    monkeypatch.setattr(User, "find_one", counting_find_one)
+    monkeypatch.setattr(hashing_pool, "verify_and_update", counting_verify)
+    return calls
+
+
+def client_from(address: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(address, 50000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def attempt(client, username: str):
+    return await client.post("/api/auth/token", data={"username": username, "password": "wrong"})
+
+
+async def test_ip_limit_answers_429_before_any_work(client, auth_headers, limits, work_counter):
+    limits.setattr(auth, "LOGIN_RATE_LIMIT_IP", Rate(2, 2 / 60))
+    async with client_from("203.0.113.1") as attacker:
+        assert [(await attempt(attacker, f"user{i}")).status_code for i in range(2)] == [401, 401]
+        done = dict(work_counter)
+        assert done["lookups"] == 2
+
+        response = await attempt(attacker, "alice")
+        assert response.status_code == 429
+        assert 0 < int(response.headers["Retry-After"]) <= 30
+        assert work_counter == done
+
+    # Another address is not affected
+    async with client_from("198.51.100.7") as user:
+        response = await user.post("/api/auth/token", data={"username": "alice", "password": PASSWORD})
+        assert response.status_code == 200
+
+
+async def test_account_limit_is_keyed_on_normalised_name(client, auth_headers, limits, work_counter):
+    limits.setattr(auth, "LOGIN_RATE_LIMIT_ACCOUNT", Rate(3, 3 / 60))
+    for i, name in enumerate(["alice", "Alice", " ALICE "]):
+        async with client_from(f"203.0.113.{i + 1}") as attacker:
+            assert (await attempt(attacker, name)).status_code == 401
+    done = dict(work_counter)
+    assert done["lookups"] == 3
+
+    async with client_from("203.0.113.9") as attacker:
+        response = await attempt(attacker, "aLiCe")
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+    assert work_counter == done
+
+    # Other accounts keep their own bucket
+    async with client_from("203.0.113.9") as attacker:
+        assert (await attempt(attacker, "bob")).status_code == 401
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import RefreshSession
+from tests.conftest import PASSWORD, signup_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def login(client, username: str = "alice") -> dict:
+    response = await client.post("/api/auth/token", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def refresh(client, refresh_token: str):
+    return await client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+async def test_refresh_rotates_the_token(client, auth_headers):
+    tokens = await login(client)
+
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    response = await client.get("/api/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert response.json()["username"] == "alice"
+
+    # The replacement works once more
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 200
+
+
+async def test_consumed_refresh_token_is_rejected(client, auth_headers):
+    tokens = await login(client)
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 200
+
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+async def test_expired_refresh_token_is_rejected(client, auth_headers):
+    tokens = await login(client)
+    await RefreshSession.get_motor_collection().update_many(
+        {}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+async def test_logout_revokes_the_refresh_token(client, auth_headers):
+    tokens = await login(client)
+
+    response = await client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+async def test_revoke_all_sessions(client, auth_headers):
+    await signup_and_login(client, "bob")
+    other_user = await login(client, "bob")
+    sessions = [await login(client) for _ in range(2)]
+    alice_id = (await client.get("/api/users/me", headers=auth_headers)).json()["id"]
+    owned = await RefreshSession.find({"user_id": alice_id}).count()
+    assert owned >= 2
+
+    response = await client.delete("/api/auth/sessions", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"revoked": owned}
+    for tokens in sessions:
+        assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+    # Other users keep their sessions
+    assert (await refresh(client, other_user["refresh_token"])).status_code == 200
+
+
+async def test_revoke_all_sessions_requires_authentication(client):
+    assert (await client.delete("/api/auth/sessions")).status_code == 401
@@ -0,0 +1,46 @@
+import pytest
+
+from app.routers import system
+
+pytestmark = pytest.mark.anyio
+
+PATHS = ["/internal/hashing", "/internal/db-pool"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_internal_endpoints_disabled_without_token(client, monkeypatch, path):
+    monkeypatch.setattr(system, "INTERNAL_API_TOKEN", None)
+    response = await client.get(path, headers={"Authorization": "Bearer anything"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_internal_endpoints_require_token(client, auth_headers, monkeypatch, path):
+    monkeypatch.setattr(system, "INTERNAL_API_TOKEN", "operator-token")
+    assert (await client.get(path)).status_code == 401
+    # A user's access token is not enough
+    assert (await client.get(path, headers=auth_headers)).status_code == 401
+    response = await client.get(path, headers={"Authorization": "Bearer operator-token"})
+    assert response.status_code == 200
+
+
+async def test_metrics_expose_running_totals_as_counters(client, auth_headers):
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    samples = {}
+    types = {}
+    for line in response.text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+
+    for name in ("password_hash_completed_total", "mongodb_pool_connections_created_total"):
+        assert types[name] == "counter"
+    # Signup and login for auth_headers each ran a hash
+    assert samples["password_hash_completed_total"] >= 2
+    for name in ("password_hash_waiting", "mongodb_pool_open"):
+        assert types[name] == "gauge"
+    assert not any(kind == "gauge" and name.endswith("_total") for name, kind in types.items())
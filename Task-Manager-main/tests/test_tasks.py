@@ -0,0 +1,215 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app import models
+from tests.conftest import signup_and_login
+
+pytestmark = pytest.mark.anyio
+
+NEW_TASK = {
+    "title": "Write report",
+    "description": "Quarterly numbers",
+    "priority": "high",
+    "due_date": datetime(2030, 1, 1).isoformat(),
+}
+
+
+async def create_task(client, headers) -> dict:
+    response = await client.post("/api/tasks/", json=NEW_TASK, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_update_ignores_null_required_fields(client, auth_headers):
+    task = await create_task(client, auth_headers)
+
+    response = await client.put(f"/api/tasks/{task['id']}", headers=auth_headers, json={
+        "title": None, "description": None, "priority": None, "completed": None
+    })
+    assert response.status_code == 200, response.text
+    updated = response.json()
+    for field in ("title", "description", "priority", "completed"):
+        assert updated[field] == task[field]
+
+    response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    response = await client.get("/api/tasks/stats", headers=auth_headers)
+    assert response.json()["by_priority"]["high"] == 1
+
+
+async def test_update_null_due_date_clears_it(client, auth_headers):
+    task = await create_task(client, auth_headers)
+
+    response = await client.put(f"/api/tasks/{task['id']}", headers=auth_headers, json={"due_date": None})
+    assert response.status_code == 200, response.text
+    assert response.json()["due_date"] is None
+    assert response.json()["title"] == task["title"]
+
+
+async def test_bulk_update_ignores_null_required_fields(client, auth_headers):
+    task = await create_task(client, auth_headers)
+
+    response = await client.post("/api/tasks/bulk", headers=auth_headers, json={
+        "operations": [{"op": "update", "id": task["id"], "changes": {"title": None, "completed": True}}]
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == 1
+
+    response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == task["title"]
+    assert response.json()["completed"] is True
+
+
+async def test_stats_and_count_follow_writes_from_other_workers(client, auth_headers):
+    task = await create_task(client, auth_headers)
+    response = await client.get("/api/tasks/stats", headers=auth_headers)
+    assert response.json()["total"] == 1
+
+    # Another worker's write: its caches are not ours, only the version is shared
+    document = await models.Task.get_motor_collection().find_one({"_id": ObjectId(task["id"])})
+    document.pop("_id")
+    await models.Task.get_motor_collection().insert_one(document)
+    await models.TaskVersion.get_motor_collection().update_one(
+        {"_id": task["owner_id"]}, {"$inc": {"version": 1}}
+    )
+
+    response = await client.get("/api/tasks/stats", headers=auth_headers)
+    assert response.json()["total"] == 2
+    response = await client.get("/api/tasks/", headers=auth_headers)
+    assert response.headers["X-Total-Count"] == "2"
+
+
+async def test_list_etag_returns_304_until_a_write(client, auth_headers):
+    await create_task(client, auth_headers)
+    response = await client.get("/api/tasks/", headers=auth_headers)
+    etag = response.headers["ETag"]
+
+    response = await client.get("/api/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    await create_task(client, auth_headers)
+    response = await client.get("/api/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+
+async def test_list_ignores_if_modified_since(client, auth_headers):
+    await create_task(client, auth_headers)
+    response = await client.get("/api/tasks/", headers=auth_headers)
+    last_modified = response.headers["Last-Modified"]
+
+    # A second write within the same second keeps Last-Modified unchanged
+    await create_task(client, auth_headers)
+    response = await client.get("/api/tasks/", headers={**auth_headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+async def test_item_conditional_get(client, auth_headers):
+    task = await create_task(client, auth_headers)
+    response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+
+    response = await client.get(f"/api/tasks/{task['id']}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    response = await client.get(
+        f"/api/tasks/{task['id']}", headers={**auth_headers, "If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    await client.put(f"/api/tasks/{task['id']}", headers=auth_headers, json={"title": "Renamed"})
+    response = await client.get(f"/api/tasks/{task['id']}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["title"] == "Renamed"
+
+
+async def test_bulk_ordered_stops_at_first_error(client, auth_headers):
+    task = await create_task(client, auth_headers)
+
+    response = await client.post("/api/tasks/bulk", headers=auth_headers, json={
+        "operations": [
+            {"op": "delete", "id": str(ObjectId())},
+            {"op": "delete", "id": "not-an-id"},
+            {"op": "update", "id": task["id"], "changes": {"completed": True}},
+            {"op": "create", "task": NEW_TASK},
+        ]
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["not_found", "error", "skipped", "skipped"]
+    assert (body["created"], body["updated"], body["failed"]) == (0, 0, 1)
+
+    response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+    assert response.json()["completed"] is False
+
+
+async def test_bulk_unordered_attempts_every_operation(client, auth_headers):
+    task = await create_task(client, auth_headers)
+
+    response = await client.post("/api/tasks/bulk", headers=auth_headers, json={
+        "ordered": False,
+        "operations": [
+            {"op": "delete", "id": "not-an-id"},
+            {"op": "update", "id": task["id"], "changes": {"completed": True}},
+            {"op": "create", "task": NEW_TASK},
+            {"op": "delete", "id": task["id"]},
+            {"op": "delete", "id": task["id"]},
+        ]
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["error", "updated", "created", "deleted", "not_found"]
+    assert (body["created"], body["updated"], body["deleted"], body["failed"]) == (1, 1, 1, 1)
+
+    response = await client.get("/api/tasks/", headers=auth_headers)
+    assert [t["id"] for t in response.json()] == [body["results"][2]["id"]]
+
+
+async def test_bulk_without_writes_keeps_etag(client, auth_headers):
+    await create_task(client, auth_headers)
+    etag = (await client.get("/api/tasks/", headers=auth_headers)).headers["ETag"]
+
+    response = await client.post("/api/tasks/bulk", headers=auth_headers, json={
+        "operations": [{"op": "delete", "id": str(ObjectId())}]
+    })
+    assert response.json()["results"][0]["status"] == "not_found"
+    response = await client.get("/api/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_bulk_rejects_oversized_batches(client, auth_headers):
+    operations = [{"op": "delete", "id": str(ObjectId())}] * (models.MAX_BULK_OPERATIONS + 1)
+    response = await client.post("/api/tasks/bulk", headers=auth_headers, json={"operations": operations})
+    assert response.status_code == 422
+
+
+async def test_delete_task(client, auth_headers):
+    task = await create_task(client, auth_headers)
+    etag = (await client.get("/api/tasks/", headers=auth_headers)).headers["ETag"]
+
+    response = await client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+    assert response.status_code == 204
+    response = await client.get("/api/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    for task_id in (task["id"], "not-an-id"):
+        response = await client.delete(f"/api/tasks/{task_id}", headers=auth_headers)
+        assert response.status_code == 404
+
+
+async def test_delete_task_of_another_user(client, auth_headers):
+    task = await create_task(client, auth_headers)
+    other = await signup_and_login(client, username="bob")
+
+    response = await client.delete(f"/api/tasks/{task['id']}", headers=other)
+    assert response.status_code == 404
+    response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+    assert response.status_code == 200
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import hashlib
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from app import cache, tokens
+from app.tokens import ALGORITHM, SECRET_KEY, create_token, decode_token, verified_tokens
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    verified_tokens.clear()
+    yield
+    verified_tokens.clear()
+
+
+def sign(secret: str, kid=None, expires=timedelta(minutes=5)) -> str:
+    claims = {"sub": "alice@example.com", "exp": datetime.utcnow() + expires}
+    headers = {"kid": kid} if kid is not None else None
+    return jwt.encode(claims, secret, algorithm=ALGORITHM, headers=headers)
+
+
+def test_current_key_verifies():
+    token = create_token({"sub": "alice@example.com"}, timedelta(minutes=5))
+    assert jwt.get_unverified_header(token)["kid"] == tokens.JWT_KEY_ID
+    assert decode_token(token)["sub"] == "alice@example.com"
+
+
+def test_unknown_kid_is_rejected():
+    with pytest.raises(JWTError):
+        decode_token(sign(SECRET_KEY, kid="unknown"))
+
+
+def test_retired_key_still_verifies(monkeypatch):
+    monkeypatch.setitem(tokens.VERIFICATION_KEYS, "old", "old-secret")
+    assert decode_token(sign("old-secret", kid="old"))["sub"] == "alice@example.com"
+    # The kid picks the key: the current secret under the old kid fails
+    with pytest.raises(JWTError):
+        decode_token(sign(SECRET_KEY, kid="old"))
+
+
+def test_token_without_kid_uses_signing_key():
+    assert decode_token(sign(SECRET_KEY))["sub"] == "alice@example.com"
+    with pytest.raises(JWTError):
+        decode_token(sign("another-secret"))
+
+
+def test_retired_keys_parse():
+    assert tokens._parse_keys("a:one, b:two,") == {"a": "one", "b": "two"}
+    with pytest.raises(ValueError):
+        tokens._parse_keys("missing-secret")
+
+
+def test_cached_token_expires_with_its_exp_claim(monkeypatch):
+    clock = [time.monotonic()]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    token = sign(SECRET_KEY, expires=timedelta(seconds=30))
+    digest = hashlib.sha256(token.encode()).digest()
+
+    decode_token(token)
+    clock[0] += 25
+    assert verified_tokens.get(digest)["sub"] == "alice@example.com"
+    clock[0] += 10
+    assert verified_tokens.get(digest) is None
+
+
+def test_expired_token_is_not_cached():
+    with pytest.raises(JWTError):
+        decode_token(sign(SECRET_KEY, expires=timedelta(seconds=-1)))
+    assert len(verified_tokens) == 0
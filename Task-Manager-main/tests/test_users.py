@@ -0,0 +1,23 @@
+import pytest
+
+from tests.conftest import signup_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_users_pages_with_cursor(client, auth_headers):
+    await signup_and_login(client, "bob")
+    await signup_and_login(client, "carol")
+
+    response = await client.get("/api/users/?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "3"
+    first_page = response.json()
+    assert [u["username"] for u in first_page] == ["alice", "bob"]
+    assert "hashed_password" not in first_page[0]
+
+    response = await client.get(
+        f"/api/users/?limit=2&cursor={response.headers['X-Next-Cursor']}", headers=auth_headers
+    )
+    assert [u["username"] for u in response.json()] == ["carol"]
+    assert "X-Next-Cursor" not in response.headers
@@ -1,5 +1,5 @@
 from beanie import Document, Link
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -8,7 +8,7 @@ class User(Document):
     username: str
     hashed_password: str
     is_active: bool = True
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "users"
@@ -28,7 +28,7 @@ class Task(Document):
     priority: str
     due_date: Optional[datetime]
     completed: bool = False
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     owner_id: str
 
     class Settings: